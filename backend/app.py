@@ -1,18 +1,62 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, has_request_context, request, jsonify, stream_with_context
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import and_, event, func, inspect as sa_inspect, or_, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import load_only, selectinload, validates
 from flask_cors import CORS
-from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime, timezone, timedelta
 from dotenv import load_dotenv
 import re
 import os
 import json
+import hashlib
+import base64
+import binascii
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 import secrets
-import requests
 import logging
+import time
+import threading
+import contextvars
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from utils.keyword_matcher import KeywordMatcher
+from utils.single_flight import SingleFlight
+from utils.news_cache import MemoryCache, create_cache
+from utils.dedup import dedupe_articles
+from utils.passwords import HasherBusy, PasswordHasher
+from utils.session_tokens import SessionTokens, bearer_token
+from utils.compression import EncodedBody, choose_encoding, compress
+from utils.upstream import CircuitOpen, UpstreamClient, UpstreamError
+from utils.quota import QueryYields, QuotaBudget
+from utils.sentiment import CachedScorer, HashedNgramModel, measure_latency
+from utils.metrics import MetricsRegistry
+from utils.logs import configure_logging, parse_levels, parse_rates, request_id_var, restart_logging_after_fork
 
 app = Flask(__name__)
 
+# Logging goes through a queue drained by a background thread, so request
+# threads never wait on stdout. LOG_LEVELS sets per-logger levels
+# ("mindly.upstream=DEBUG,werkzeug=WARNING"); LOG_SAMPLE_RATE keeps that
+# fraction of the high-volume per-request lines, LOG_SAMPLING overrides it
+# per logger.
+LOG_HANDLER = configure_logging(
+    level=os.environ.get('LOG_LEVEL', 'INFO').upper(),
+    levels=parse_levels(os.environ.get('LOG_LEVELS')),
+    fmt=os.environ.get('LOG_FORMAT', 'text'),
+    sample_rate=float(os.environ.get('LOG_SAMPLE_RATE', 0.1)),
+    sample_rates=parse_rates(os.environ.get('LOG_SAMPLING')),
+    queue_size=int(os.environ.get('LOG_QUEUE_SIZE', 10000))
+)
+log = logging.getLogger('mindly')
+db_log = logging.getLogger('mindly.db')
+scoring_log = logging.getLogger('mindly.scoring')
+upstream_log = logging.getLogger('mindly.upstream')
+feeds_log = logging.getLogger('mindly.feeds')
+http_log = logging.getLogger('mindly.http')
+
 # more permissive cors config for development - TEMPORARY
 CORS(app, 
      origins=["*"],
@@ -20,8 +64,43 @@ CORS(app,
      allow_headers=["Content-Type", "Authorization", "X-Requested-With"],
      supports_credentials=False)
 
+# Process-local metrics, scraped from /metrics
+METRICS = MetricsRegistry()
+REQUEST_LATENCY = METRICS.histogram(
+    'mindly_http_request_duration_seconds', 'Time to handle a request', ('method', 'route', 'status'))
+REQUEST_DB_QUERIES = METRICS.histogram(
+    'mindly_http_request_db_queries', 'SQL statements executed per request', ('route',),
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100))
+REQUEST_DB_SECONDS = METRICS.histogram(
+    'mindly_http_request_db_seconds', 'Time spent executing SQL per request', ('route',))
+DB_QUERIES = METRICS.counter('mindly_db_queries_total', 'SQL statements executed')
+DB_SECONDS = METRICS.counter('mindly_db_query_seconds_total', 'Time spent executing SQL statements')
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info['query_started'] = time.perf_counter()
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def record_query(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info.pop('query_started', time.perf_counter())
+    DB_QUERIES.inc()
+    DB_SECONDS.inc(elapsed)
+    if has_request_context() and 'db_queries' in g:
+        g.db_queries += 1
+        g.db_seconds += elapsed
+
+# Request ids are made of these characters; anything else in X-Request-ID is replaced
+REQUEST_ID_PATTERN = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
 @app.before_request
 def handle_preflight():
+    g.request_started = time.perf_counter()
+    request_id = request.headers.get('X-Request-ID', '')
+    g.request_id = request_id if REQUEST_ID_PATTERN.match(request_id) else secrets.token_hex(8)
+    request_id_var.set(g.request_id)
+    g.db_queries = 0
+    g.db_seconds = 0.0
+    
     if request.method == "OPTIONS":
         response = jsonify({})
         response.headers.add("Access-Control-Allow-Origin", "*")
@@ -35,6 +114,60 @@ def after_request(response):
     response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization,X-Requested-With')
     response.headers.add('Access-Control-Allow-Methods', 'GET,PUT,POST,DELETE,OPTIONS')
     response.headers.add('Access-Control-Allow-Credentials', 'false')
+    if 'request_id' in g:
+        response.headers['X-Request-ID'] = g.request_id
+    
+    # Registered first, so this runs after every other after_request hook (compression included)
+    if 'request_started' in g:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        REQUEST_LATENCY.observe(time.perf_counter() - g.request_started,
+                                method=request.method, route=route, status=str(response.status_code))
+        REQUEST_DB_QUERIES.observe(g.db_queries, route=route)
+        REQUEST_DB_SECONDS.observe(g.db_seconds, route=route)
+    return response
+
+@app.teardown_request
+def clear_request_id(exc):
+    # Worker threads are reused; don't tag later background work with this request
+    request_id_var.set('-')
+
+# Responses smaller than this aren't worth the CPU (and gzip overhead) to compress
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 512))
+COMPRESSIBLE_MIMETYPES = {'application/json', 'text/plain', 'text/html'}
+# Compressed bodies of cacheable GET responses, keyed by body hash and encoding
+COMPRESSED_BODIES = MemoryCache(max_entries=int(os.environ.get('COMPRESSION_CACHE_ENTRIES', 256)))
+COMPRESSED_BODY_TTL = 3600
+
+@app.after_request
+def compress_response(response):
+    """Gzip/brotli-encode JSON responses for clients that accept it"""
+    if (response.direct_passthrough or response.is_streamed
+            or response.status_code < 200 or response.status_code in (204, 304)
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+    
+    response.vary.add('Accept-Encoding')
+    encoding = choose_encoding(request.accept_encodings)
+    body = response.get_data()
+    if encoding is None or len(body) < COMPRESSION_MIN_SIZE:
+        return response
+    
+    cache_control = response.headers.get('Cache-Control', '')
+    cacheable = request.method == 'GET' and 'no-store' not in cache_control and 'private' not in cache_control
+    if cacheable:
+        cache_key = f"{encoding}:{hashlib.sha256(body).hexdigest()}"
+        cached = COMPRESSED_BODIES.get(cache_key)
+        if cached:
+            compressed = cached[0]
+        else:
+            compressed = compress(body, encoding)
+            COMPRESSED_BODIES.set(cache_key, compressed, COMPRESSED_BODY_TTL)
+    else:
+        compressed = compress(body, encoding)
+    
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
     return response
 
 basedir = os.path.abspath(os.path.dirname(__file__))
@@ -43,84 +176,386 @@ os.makedirs(db_dir, exist_ok=True)
 db_path = os.path.join(db_dir, 'users.db')
 
 # Database Configuration
-app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{db_path}'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', f'sqlite:///{db_path}')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
+# Signs session tokens. Set SECRET_KEY in production: the random fallback
+# invalidates every token on restart and differs between worker processes.
+app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY') or secrets.token_hex(32)
+SESSION_TOKEN_MAX_AGE = int(os.environ.get('SESSION_TOKEN_MAX_AGE', 30 * 24 * 3600))
+SESSION_TOKENS = SessionTokens(app.config['SECRET_KEY'], SESSION_TOKEN_MAX_AGE)
+# Per-user routes reject requests that don't carry a session token. Setting this to
+# false lets a bare username act for that user, for old clients only
+REQUIRE_SESSION_TOKEN = os.environ.get('REQUIRE_SESSION_TOKEN', 'true').lower() == 'true'
+if not REQUIRE_SESSION_TOKEN:
+    log.warning("⚠️ REQUIRE_SESSION_TOKEN is off: per-user routes accept requests without a session token")
+
 
 # News API Configuration
 NEWS_API_KEY = os.environ["NEWS_API_KEY"]
-NEWS_CACHE = {}
-NEWS_CACHE_DURATION = timedelta(hours=2)
+NEWS_CACHE_DURATION = timedelta(minutes=float(os.environ.get('NEWS_CACHE_MINUTES', 120)))
+# Expired feeds are kept this much longer so they can be served stale during a refresh
+NEWS_CACHE_STALE_FOR = timedelta(hours=float(os.environ.get('NEWS_CACHE_STALE_HOURS', 24)))
+# 'memory' keeps the cache per process, 'sqlite' shares it between worker processes
+NEWS_CACHE_BACKEND = os.environ.get('NEWS_CACHE_BACKEND', 'memory')
+NEWS_CACHE_PATH = os.environ.get('NEWS_CACHE_PATH', os.path.join(db_dir, 'news_cache.db'))
+NEWS_CACHE_MAX_ENTRIES = int(os.environ.get('NEWS_CACHE_MAX_ENTRIES', 128))
+NEWS_CACHE = create_cache(NEWS_CACHE_BACKEND, path=NEWS_CACHE_PATH, max_entries=NEWS_CACHE_MAX_ENTRIES)
+FEED_SIZE = 15
+# How many stored stories are considered (before dedup) when building the feed
+FEED_CANDIDATES = 60
+# Only stories published within this window are served from the article store
+NEWS_ARCHIVE_WINDOW = timedelta(days=float(os.environ.get('NEWS_ARCHIVE_DAYS', 7)))
+# How long clients may reuse a feed response before revalidating with If-None-Match
+FEED_MAX_AGE = int(os.environ.get('FEED_MAX_AGE', 300))
+# Personalized rankings are shared by every user with the same preference set
+PERSONALIZED_FEED_TTL = timedelta(minutes=float(os.environ.get('PERSONALIZED_FEED_TTL_MINUTES', 10)))
+# Kept apart from NEWS_CACHE so many distinct preference sets can't evict the shared
+# feeds; they are rebuilt from the article store, so a per-process cache is enough
+PERSONALIZED_FEEDS = MemoryCache(max_entries=int(os.environ.get('PERSONALIZED_FEED_CACHE_ENTRIES', 512)))
+# Titles sharing more than this fraction of words are treated as the same story
+DEDUP_OVERLAP_THRESHOLD = float(os.environ.get('DEDUP_OVERLAP_THRESHOLD', 0.6))
+WORLD_NEWS_CACHE_DURATION = timedelta(minutes=float(os.environ.get('WORLD_NEWS_CACHE_MINUTES', 60)))
+# The refresher rebuilds the feed once it reaches this fraction of NEWS_CACHE_DURATION
+NEWS_REFRESH_AHEAD = float(os.environ.get('NEWS_REFRESH_AHEAD', 0.8))
+NEWS_REFRESH_RETRY = 60  # seconds to wait after a failed background refresh
+NEWS_REFRESHER_ENABLED = os.environ.get('NEWS_REFRESHER_ENABLED', 'true').lower() == 'true'
+# Build every feed in create_app() so the first requests after a (re)start are cache hits
+WARM_FEEDS = os.environ.get('WARM_FEEDS', 'true').lower() == 'true'
+
+# Password hashing runs on a small process pool; see utils/passwords.py for a
+# benchmark of candidate methods (python -m utils.passwords)
+PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:600000')
+PASSWORDS = PasswordHasher(
+    PASSWORD_HASH_METHOD,
+    workers=int(os.environ.get('PASSWORD_HASH_WORKERS', 2)),
+    max_pending=int(os.environ.get('PASSWORD_HASH_MAX_PENDING', 32)),
+    timeout=float(os.environ.get('PASSWORD_HASH_TIMEOUT', 10))
+)
 
-print(f"📁 Database will be created at: {db_path}")
+db_log.info("📁 Database will be created at: %s", db_path)
 
 db = SQLAlchemy(app)
 
+# News preferences of users who haven't picked any
+DEFAULT_NEWS_PREFERENCES = ['community', 'kindness', 'charity']
+
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
-    password_hash = db.Column(db.String(120), nullable=False)
-    genres = db.Column(db.Text, nullable=True)  # Store as JSON string
+    password_hash = db.Column(db.String(255), nullable=False)
     profile_picture = db.Column(db.String(500), nullable=True)
-    created_at = db.Column(db.DateTime, default=datetime.now(timezone.utc))
-    news_preferences = db.Column(db.Text, nullable=True)  # Store preferred news categories
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    
+    # Genres and news preferences, one row per category (see UserCategory)
+    category_links = db.relationship('UserCategory', cascade='all, delete-orphan', lazy=True,
+                                     order_by='UserCategory.position')
+    
+    def _get_categories(self, kind):
+        return [link.category for link in self.category_links if link.kind == kind]
+    
+    def _set_categories(self, kind, categories):
+        if isinstance(categories, str) or not all(isinstance(category, str) for category in categories or []):
+            raise ValueError(f'{kind} categories must be a list of strings')
+        # Reuse existing rows so re-saving a category doesn't delete and re-insert its key
+        existing = {link.category: link for link in self.category_links if link.kind == kind}
+        links = [link for link in self.category_links if link.kind != kind]
+        for position, category in enumerate(dict.fromkeys(categories or [])):
+            link = existing.get(category) or UserCategory(kind=kind, category=category)
+            link.position = position
+            links.append(link)
+        self.category_links = links
     
     def set_genres(self, genres_list):
-        """Set genres as JSON string"""
-        self.genres = json.dumps(genres_list) if genres_list else None
+        """Set genres"""
+        self._set_categories('genre', genres_list)
     
     def get_genres(self):
         """Get genres as list"""
-        if self.genres:
-            try:
-                return json.loads(self.genres)
-            except json.JSONDecodeError:
-                return []
-        return []
+        return self._get_categories('genre')
     
     def set_news_preferences(self, preferences_list):
-        """Set news preferences as JSON string"""
-        self.news_preferences = json.dumps(preferences_list) if preferences_list else None
+        """Set news preferences"""
+        self._set_categories('preference', preferences_list)
     
     def get_news_preferences(self):
         """Get news preferences as list"""
-        if self.news_preferences:
-            try:
-                return json.loads(self.news_preferences)
-            except json.JSONDecodeError:
-                return ['community', 'kindness', 'charity']
-        return ['community', 'kindness', 'charity']
+        return self._get_categories('preference') or list(DEFAULT_NEWS_PREFERENCES)
+    
+    # API field -> (backing column or relationship, serializer). Category
+    # rows are only loaded when genres or news_preferences are requested.
+    FIELDS = {
+        'id': ('id', lambda u: u.id),
+        'username': ('username', lambda u: u.username),
+        'email': ('email', lambda u: u.email),
+        'genres': ('category_links', lambda u: u.get_genres()),
+        'profile_picture': ('profile_picture', lambda u: u.profile_picture),
+        'news_preferences': ('category_links', lambda u: u.get_news_preferences()),
+        'created_at': ('created_at', lambda u: u.created_at.isoformat())
+    }
+    
+    def to_dict(self, fields=None):
+        """Serialize the user, optionally limited to the given API fields"""
+        return {
+            name: serialize(self)
+            for name, (_, serialize) in self.FIELDS.items()
+            if fields is None or name in fields
+        }
+
+class UserCategory(db.Model):
+    """A genre or news preference picked by a user.
+
+    The primary key answers "what did this user pick"; ix_user_category_reverse
+    answers "which users picked this category" without scanning users.
+    """
+    __table_args__ = (
+        db.Index('ix_user_category_reverse', 'kind', 'category', 'user_id'),
+    )
     
- 
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    kind = db.Column(db.String(20), primary_key=True)  # 'genre' or 'preference'
+    category = db.Column(db.String(50), primary_key=True)
+    position = db.Column(db.Integer, nullable=False, default=0)
+
+def hash_article_url(url):
+    """Fixed-size key for indexing article URLs, which can be up to 1000 characters"""
+    return hashlib.sha256(url.encode('utf-8')).hexdigest()
 
 class SavedArticle(db.Model):
+    __table_args__ = (
+        # One save per article per user, enforced by the database rather than a pre-query
+        db.Index('ix_saved_article_user_url_hash', 'user_id', 'article_url_hash', unique=True),
+        # Backs the per-user "newest first" listing
+        db.Index('ix_saved_article_user_saved_at', 'user_id', 'saved_at'),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     article_title = db.Column(db.String(500), nullable=False)
     article_description = db.Column(db.Text, nullable=True)
     article_url = db.Column(db.String(1000), nullable=False)
+    article_url_hash = db.Column(db.String(64), nullable=False)
     article_image_url = db.Column(db.String(1000), nullable=True)
     article_source = db.Column(db.String(200), nullable=True)
     article_published_at = db.Column(db.String(100), nullable=True)
-    saved_at = db.Column(db.DateTime, default=datetime.now(timezone.utc))
+    saved_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     
    
     user = db.relationship('User', backref=db.backref('saved_articles', lazy=True))
     
+    @validates('article_url')
+    def update_url_hash(self, key, url):
+        self.article_url_hash = hash_article_url(url)
+        return url
+    
+    # API field -> (backing column, serializer)
+    FIELDS = {
+        'id': ('id', lambda a: a.id),
+        'title': ('article_title', lambda a: a.article_title),
+        'description': ('article_description', lambda a: a.article_description),
+        'url': ('article_url', lambda a: a.article_url),
+        'urlToImage': ('article_image_url', lambda a: a.article_image_url),
+        'source': ('article_source', lambda a: {'name': a.article_source} if a.article_source else None),
+        'publishedAt': ('article_published_at', lambda a: a.article_published_at),
+        'savedAt': ('saved_at', lambda a: a.saved_at.isoformat()),
+        'userId': ('user_id', lambda a: a.user_id)
+    }
+    
+    def to_dict(self, fields=None):
+        """Serialize the article, optionally limited to the given API fields"""
+        return {
+            name: serialize(self)
+            for name, (_, serialize) in self.FIELDS.items()
+            if fields is None or name in fields
+        }
+
+
+class Article(db.Model):
+    """An upstream article, scored once when first ingested"""
+    __table_args__ = (
+        db.Index('ix_article_feed', 'community_focus', 'sentiment_score', 'published_at'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    url_hash = db.Column(db.String(64), unique=True, nullable=False)
+    url = db.Column(db.String(1000), nullable=False)
+    title = db.Column(db.String(500), nullable=False)
+    description = db.Column(db.Text, nullable=True)
+    image_url = db.Column(db.String(1000), nullable=True)
+    source = db.Column(db.String(200), nullable=True)
+    published_at_raw = db.Column(db.String(100), nullable=True)
+    published_at = db.Column(db.DateTime, nullable=False)
+    first_seen_at = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+    sentiment_score = db.Column(db.Float, nullable=False)
+    community_focus = db.Column(db.Boolean, nullable=False)
+    
+    categories = db.relationship('ArticleCategory', cascade='all, delete-orphan', lazy=True)
+    
+    @classmethod
+    def from_upstream(cls, article, url, url_hash, sentiment_score, community_focus):
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        source = article.get('source') or {}
+        return cls(
+            url_hash=url_hash,
+            url=url,
+            title=article.get('title', '')[:500],
+            description=article.get('description') or '',
+            image_url=article.get('urlToImage') or '',
+            source=(source.get('name') or '')[:200],
+            published_at_raw=article.get('publishedAt') or '',
+            published_at=parse_published_at(article.get('publishedAt')) or now,
+            first_seen_at=now,
+            sentiment_score=sentiment_score,
+            community_focus=community_focus
+        )
+    
     def to_dict(self):
         return {
-            'id': self.id,
-            'title': self.article_title,
-            'description': self.article_description,
-            'url': self.article_url,
-            'urlToImage': self.article_image_url,
-            'source': {'name': self.article_source} if self.article_source else None,
-            'publishedAt': self.article_published_at,
-            'savedAt': self.saved_at.isoformat(),
-            'userId': self.user_id
+            'title': self.title,
+            'description': self.description,
+            'url': self.url,
+            'urlToImage': self.image_url,
+            'publishedAt': self.published_at_raw or self.published_at.isoformat(),
+            'source': {'name': self.source},
+            'sentiment_score': self.sentiment_score,
+            'community_focus': self.community_focus
         }
 
+class ArticleCategory(db.Model):
+    """Posting list entry: the article matches this news category.
+
+    The (category, article_id) primary key doubles as the category -> articles index.
+    """
+    category = db.Column(db.String(50), primary_key=True)
+    article_id = db.Column(db.Integer, db.ForeignKey('article.id'), primary_key=True)
+
+class FeedEntry(db.Model):
+    """An article's score in one named feed; a feed is served from its included entries"""
+    __table_args__ = (
+        db.Index('ix_feed_entry_rank', 'feed', 'included', 'sentiment_score'),
+    )
+    
+    feed = db.Column(db.String(50), primary_key=True)
+    article_id = db.Column(db.Integer, db.ForeignKey('article.id'), primary_key=True)
+    sentiment_score = db.Column(db.Float, nullable=False)
+    included = db.Column(db.Boolean, nullable=False)
+    
+    article = db.relationship('Article')
+
+class IngestWatermark(db.Model):
+    """Newest publishedAt seen per upstream query, used as the next fetch's lower bound"""
+    source_key = db.Column(db.String(300), primary_key=True)
+    last_published_at = db.Column(db.DateTime, nullable=False)
+
+def normalize_article_url(url):
+    """Canonical form of an article URL so tracking parameters don't create duplicates"""
+    url = url.strip()
+    if not url:
+        return ''
+    
+    parts = urlsplit(url)
+    query = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith('utm_')
+    ]
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(query), ''))
+
+def parse_published_at(value):
+    """Parse an upstream ISO 8601 timestamp into naive UTC, or None"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if parsed.tzinfo:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+def migrate_database():
+    """Bring an existing database up to the current schema.
+
+    db.create_all() only creates missing tables, so columns and indexes added
+    to existing tables are applied here. Safe to run on every start.
+    """
+    inspector = sa_inspect(db.engine)
+    if 'saved_article' not in inspector.get_table_names():
+        return
+    
+    columns = {column['name'] for column in inspector.get_columns('saved_article')}
+    if 'article_url_hash' not in columns:
+        db_log.info("🛠️ Adding article_url_hash to saved_article")
+        db.session.execute(text('ALTER TABLE saved_article ADD COLUMN article_url_hash VARCHAR(64)'))
+    
+    missing_hashes = db.session.execute(
+        text('SELECT id, article_url FROM saved_article WHERE article_url_hash IS NULL')
+    ).all()
+    if missing_hashes:
+        db.session.execute(
+            text('UPDATE saved_article SET article_url_hash = :url_hash WHERE id = :id'),
+            [{'id': row_id, 'url_hash': hash_article_url(url)} for row_id, url in missing_hashes]
+        )
+    
+    # Older databases could hold duplicate saves; keep the first one before adding the unique index
+    removed = db.session.execute(text(
+        'DELETE FROM saved_article WHERE id NOT IN ('
+        ' SELECT MIN(id) FROM saved_article GROUP BY user_id, article_url_hash)'
+    )).rowcount
+    if removed:
+        db_log.info("🛠️ Removed %d duplicate saved articles", removed)
+    db.session.commit()
+    
+    for index in SavedArticle.__table__.indexes:
+        index.create(bind=db.engine, checkfirst=True)
+    
+    # Genres and news preferences used to be JSON text columns on user
+    user_columns = {column['name'] for column in inspector.get_columns('user')} if 'user' in inspector.get_table_names() else set()
+    if {'genres', 'news_preferences'} <= user_columns:
+        rows = db.session.execute(text(
+            'SELECT id, genres, news_preferences FROM user'
+            ' WHERE genres IS NOT NULL OR news_preferences IS NOT NULL'
+        )).all()
+        for user_id, genres, news_preferences in rows:
+            user = db.session.get(User, user_id)
+            for kind, blob in (('genre', genres), ('preference', news_preferences)):
+                try:
+                    categories = json.loads(blob) if blob else []
+                except json.JSONDecodeError:
+                    categories = []
+                if isinstance(categories, list) and categories:
+                    user._set_categories(kind, [str(category) for category in categories])
+        # Clearing the blobs marks these users as migrated
+        db.session.execute(text('UPDATE user SET genres = NULL, news_preferences = NULL'))
+        db.session.commit()
+        if rows:
+            db_log.info("🛠️ Moved genres and news preferences of %d users to user_category", len(rows))
+    
+    # Articles stored before named feeds existed all belong to the community feed
+    tables = inspector.get_table_names()
+    if 'article' in tables and 'feed_entry' in tables and not FeedEntry.query.first():
+        added = db.session.execute(text(
+            "INSERT INTO feed_entry (feed, article_id, sentiment_score, included)"
+            " SELECT 'community', id, sentiment_score, community_focus FROM article"
+        )).rowcount
+        db.session.commit()
+        if added:
+            db_log.info("🛠️ Added %d stored articles to the community feed", added)
+    
+    # Articles stored before category tagging existed have no postings yet
+    tables = inspector.get_table_names()
+    if 'article' in tables and 'article_category' in tables and not ArticleCategory.query.first():
+        tagged = 0
+        for article in Article.query.filter(Article.community_focus.is_(True)).all():
+            article.categories = [
+                ArticleCategory(category=category)
+                for category in match_categories({'title': article.title, 'description': article.description})
+            ]
+            tagged += 1
+        db.session.commit()
+        if tagged:
+            db_log.info("🛠️ Tagged %d stored articles with news categories", tagged)
 
 # Community-focused news filtering configuration
 COMMUNITY_POSITIVE_KEYWORDS = [
@@ -162,7 +597,7 @@ COMMUNITY_POSITIVE_KEYWORDS = [
 ]
 
 # Exclude sports, entertainment, celebrity, and business-focused content
-EXCLUDE_KEYWORDS = [
+OFF_TOPIC_KEYWORDS = [
     # Sports & Competition
     'team wins', 'championship', 'playoffs', 'tournament', 'league', 'sports',
     'football', 'basketball', 'baseball', 'soccer', 'tennis', 'golf',
@@ -179,9 +614,11 @@ EXCLUDE_KEYWORDS = [
     
     # Politics (to avoid divisive content)
     'election', 'political', 'congress', 'senate', 'democrat', 'republican',
-    'president', 'governor', 'mayor', 'campaign', 'vote', 'ballot',
-    
-    # Negative content
+    'president', 'governor', 'mayor', 'campaign', 'vote', 'ballot'
+]
+
+# Negative content
+NEGATIVE_KEYWORDS = [
     'war', 'death', 'murder', 'terrorism', 'shooting', 'crash', 'disaster',
     'pandemic', 'crisis', 'protest', 'conflict', 'attack', 'violence',
     'crime', 'fraud', 'scandal', 'corruption', 'abuse', 'assault',
@@ -189,48 +626,184 @@ EXCLUDE_KEYWORDS = [
     'explosion', 'accident', 'injury', 'lawsuit', 'court case'
 ]
 
-def community_sentiment_analysis(text):
-    """Community-focused sentiment analysis based on keyword counting"""
-    text = text.lower()
+EXCLUDE_KEYWORDS = OFF_TOPIC_KEYWORDS + NEGATIVE_KEYWORDS
+
+def article_text(article):
+    """The text keyword matching looks at: title and description"""
+    return f"{article.get('title') or ''} {article.get('description') or ''}"
+
+class FilterProfile:
+    """Keyword filter deciding which articles a feed keeps and how they rank.
+
+    With a sentiment `scorer` the model's score replaces the keyword score and
+    `tone_keywords` (a subset of the excludes) no longer veto an article, so a
+    recovery story mentioning a fire can still get in; positive keywords still
+    decide whether a story is on topic and the remaining excludes still apply.
+    """
+    
+    def __init__(self, positive_keywords, exclude_keywords, min_score=0.2, scorer=None, tone_keywords=()):
+        self.matcher = KeywordMatcher({
+            'positive': positive_keywords,
+            'exclude': exclude_keywords,
+            'tone': tone_keywords
+        })
+        self.min_score = min_score
+        self.scorer = scorer
+    
+    def score(self, article):
+        """Score one article; returns (sentiment_score, keep)"""
+        if self.scorer is not None:
+            return self.score_many([article])[0]
+        
+        content = article_text(article)
+        
+        # One pass over the text gives both positive and excluded keyword hits
+        counts = self.matcher.count(content)
+        sentiment_score = score_keyword_counts(counts)
+        
+        # Skip articles with excluded keywords (sports, entertainment, etc.) and
+        # only keep articles that have positive keywords AND positive sentiment
+        keep = counts['exclude'] == 0 and counts['positive'] > 0 and sentiment_score > self.min_score
+        return sentiment_score, keep
+    
+    def score_many(self, articles):
+        """score() for a whole batch of articles, scanned together in one pass"""
+        texts = [article_text(article) for article in articles]
+        counts = self.matcher.count_many(texts)
+        
+        model_scores = None
+        if self.scorer is not None:
+            try:
+                model_scores = self.scorer.score_many(texts)
+            except Exception as e:
+                scoring_log.warning("⚠️ Sentiment model failed, falling back to keyword scores: %s", e)
+        
+        results = []
+        for index, (positive, exclude, tone) in enumerate(zip(counts['positive'], counts['exclude'], counts['tone'])):
+            if model_scores is None:
+                sentiment_score = score_keyword_counts({'positive': positive, 'exclude': exclude})
+                keep = exclude == 0 and positive > 0 and sentiment_score > self.min_score
+            else:
+                sentiment_score = model_scores[index]
+                keep = exclude == tone and positive > 0 and sentiment_score > self.min_score
+            results.append((sentiment_score, keep))
+        return results
+
+# Optional ML sentiment model (see utils/sentiment.py); without one the keyword scorer is used
+SENTIMENT_MODEL_PATH = os.environ.get('SENTIMENT_MODEL_PATH')
+SENTIMENT_CACHE_SIZE = int(os.environ.get('SENTIMENT_CACHE_SIZE', 20000))
+# Per-article scoring budget at ingestion; a model slower than this is not used
+SENTIMENT_LATENCY_BUDGET_MS = float(os.environ.get('SENTIMENT_LATENCY_BUDGET_MS', 0.5))
+
+def load_sentiment_scorer():
+    """The configured sentiment model behind its score cache, or None to use keyword scoring"""
+    if not SENTIMENT_MODEL_PATH:
+        return None
     
-    # Count community-positive words
-    community_positive_count = sum(1 for word in COMMUNITY_POSITIVE_KEYWORDS if word in text)
+    try:
+        model = HashedNgramModel.load(SENTIMENT_MODEL_PATH)
+    except Exception as e:
+        scoring_log.warning("⚠️ Could not load sentiment model %s, using keyword scoring: %s", SENTIMENT_MODEL_PATH, e)
+        return None
     
-    # Check for excluded content
-    exclude_count = sum(1 for word in EXCLUDE_KEYWORDS if word in text)
+    # Article-sized texts (title plus description, ~60 words) built from the keyword lists
+    vocabulary = COMMUNITY_POSITIVE_KEYWORDS + EXCLUDE_KEYWORDS
+    samples = [' '.join(vocabulary[start:start + 60]) for start in range(0, len(vocabulary), 7)]
+    latency_ms = measure_latency(model, samples) * 1000
+    if latency_ms > SENTIMENT_LATENCY_BUDGET_MS:
+        scoring_log.warning("⚠️ Sentiment model takes %.3f ms/article, over the %s ms budget; using keyword scoring",
+                            latency_ms, SENTIMENT_LATENCY_BUDGET_MS)
+        return None
     
+    scoring_log.info("🧠 Loaded %s sentiment model (%d weights, %.3f ms/article)", model.name, len(model.weights), latency_ms)
+    return CachedScorer(model, max_entries=SENTIMENT_CACHE_SIZE)
+
+SENTIMENT_SCORER = load_sentiment_scorer()
+
+COMMUNITY_PROFILE = FilterProfile(COMMUNITY_POSITIVE_KEYWORDS, EXCLUDE_KEYWORDS,
+                                  scorer=SENTIMENT_SCORER, tone_keywords=NEGATIVE_KEYWORDS)
+COMMUNITY_MATCHER = COMMUNITY_PROFILE.matcher
+
+# Uplifting stories beyond the local community, for the world feed
+WORLD_POSITIVE_KEYWORDS = [
+    'breakthrough', 'discovery', 'milestone', 'rescue', 'rescued', 'reunited',
+    'renewable', 'clean energy', 'reforestation', 'wildlife', 'endangered species',
+    'species recovery', 'ocean cleanup', 'humanitarian', 'aid workers', 'refugees welcomed',
+    'vaccine rollout', 'cure', 'eradicated', 'innovation', 'invention', 'record low',
+    'international cooperation', 'peace agreement', 'girls education', 'clean water'
+]
+
+WORLD_PROFILE = FilterProfile(COMMUNITY_POSITIVE_KEYWORDS + WORLD_POSITIVE_KEYWORDS, EXCLUDE_KEYWORDS,
+                              scorer=SENTIMENT_SCORER, tone_keywords=NEGATIVE_KEYWORDS)
+
+# Keywords that place a story in each of the categories users can pick as news preferences
+CATEGORY_KEYWORDS = {
+    'community': ['community', 'neighborhood', 'neighbors helping', 'community comes together',
+                  'community center', 'community garden', 'unity', 'solidarity'],
+    'kindness': ['kindness', 'compassion', 'generosity', 'good samaritan', 'stranger helps',
+                 'random act', 'pay it forward', 'helping hand', 'caring'],
+    'charity': ['charity', 'donation', 'donate', 'fundraiser', 'fundraising', 'nonprofit',
+                'food bank', 'food drive', 'school fundraiser'],
+    'volunteering': ['volunteer', 'volunteers', 'volunteering', 'meals on wheels', 'clean up',
+                     'nursing home visit'],
+    'mutual-aid': ['mutual aid', 'disaster relief', 'crisis support', 'community resilience',
+                   'recovery effort', 'rebuild', 'homeless shelter'],
+    'wholesome': ['kindness', 'random act', 'pay it forward', 'therapy dog', 'teacher appreciation',
+                  'stranger helps'],
+    'local-news': ['local', 'neighborhood', 'local artist', 'mural project', 'public art',
+                   'cultural celebration', 'community choir'],
+    'social-good': ['social change', 'activism', 'grassroots', 'inclusion', 'accessibility',
+                    'barrier-free', 'disability support'],
+    'environmental': ['conservation', 'environmental stewardship', 'sustainability initiative',
+                      'community garden', 'restoration', 'beautification', 'revitalization', 'clean up'],
+    'education': ['mentorship', 'tutoring', 'scholarship', 'education program', 'youth program',
+                  'after school', 'literacy', 'library', 'teacher appreciation', 'student achievement'],
+    'health-wellness': ['health clinic', 'medical mission', 'therapy dog', 'mental health support',
+                        'wellness program', 'support group', 'recovery', 'healing', 'art therapy',
+                        'music therapy', 'elderly care', 'senior center']
+}
+
+CATEGORY_MATCHER = KeywordMatcher(CATEGORY_KEYWORDS)
+
+def match_categories(article):
+    """News categories an article's title and description fall into"""
+    return [category for category, hits in CATEGORY_MATCHER.count(article_text(article)).items() if hits]
+
+def match_categories_many(articles):
+    """match_categories() for a whole batch of articles"""
+    counts = CATEGORY_MATCHER.count_many([article_text(article) for article in articles])
+    return [
+        [category for category, hits in counts.items() if hits[index]]
+        for index in range(len(articles))
+    ]
+
+def score_keyword_counts(counts):
+    """Turn positive/exclude keyword hit counts into a community sentiment score"""
     # If excluded content is found, heavily penalize
-    if exclude_count > 0:
+    if counts['exclude'] > 0:
         return -1.0
     
     # Score based on community keywords (higher weight for community focus)
-    if community_positive_count > 0:
-        return min(community_positive_count * 0.3, 1.0)  # Higher weight than before
+    if counts['positive'] > 0:
+        return min(counts['positive'] * 0.3, 1.0)  # Higher weight than before
     
     return 0.0
 
+def community_sentiment_analysis(text):
+    """Community-focused sentiment analysis based on keyword counting"""
+    return score_keyword_counts(COMMUNITY_MATCHER.count(text))
+
+def score_community_article(article):
+    """Score one article against the community feed; returns (sentiment_score, is_community_story)"""
+    return COMMUNITY_PROFILE.score(article)
+
 def filter_community_news(articles):
     """Filter articles to keep only community-focused feel-good stories"""
     filtered_articles = []
     
     for article in articles:
-        title = article.get('title', '').lower()
-        description = article.get('description', '').lower() if article.get('description') else ''
-        content = f"{title} {description}"
-        
-        # Skip articles with excluded keywords (sports, entertainment, etc.)
-        has_excluded = any(keyword in content for keyword in EXCLUDE_KEYWORDS)
-        if has_excluded:
-            continue
-        
-        # Check if article has community-focused keywords
-        has_community_keywords = any(keyword in content for keyword in COMMUNITY_POSITIVE_KEYWORDS)
-        
-        # Check sentiment using community-focused analysis
-        sentiment_score = community_sentiment_analysis(content)
-        
-        # Only keep articles that have community keywords AND positive sentiment
-        if has_community_keywords and sentiment_score > 0.2:
+        sentiment_score, is_community_story = score_community_article(article)
+        if is_community_story:
             article['sentiment_score'] = sentiment_score
             article['community_focus'] = True
             filtered_articles.append(article)
@@ -238,166 +811,802 @@ def filter_community_news(articles):
     # Sort by sentiment score (most community-positive first)
     filtered_articles.sort(key=lambda x: x.get('sentiment_score', 0), reverse=True)
     
-    return filtered_articles[:15]  # Return top 15 community-focused articles
+    return filtered_articles[:FEED_SIZE]  # Return top 15 community-focused articles
 
-def fetch_feel_good_news():
-    """Fetch and filter community-focused feel-good news"""
-    cache_key = 'community_feel_good_news'
+COMMUNITY_QUERIES = [
+    'community volunteer charity kindness',
+    'neighbors helping local support',
+    'food bank donation fundraiser nonprofit',
+    'good samaritan random act kindness',
+    'community garden clean up beautification',
+    'mentorship tutoring youth program',
+    'disaster relief mutual aid recovery',
+    'senior center elderly care support',
+    'community comes together unity'
+]
+
+GUARDIAN_QUERY = 'community AND (volunteer OR charity OR kindness OR helping OR support)'
+
+WORLD_QUERIES = [
+    'scientific breakthrough discovery',
+    'wildlife conservation endangered species recovery',
+    'renewable clean energy milestone',
+    'humanitarian aid rescue reunited',
+    'medical breakthrough cure vaccine',
+    'girls education clean water access',
+    'reforestation ocean cleanup'
+]
+
+WORLD_GUARDIAN_QUERY = 'breakthrough OR conservation OR rescue OR renewable OR humanitarian'
+
+NEWSAPI_PARAMS = {
+    'language': 'en',
+    'sortBy': 'publishedAt',
+    'pageSize': 15,
+    'excludeDomains': 'espn.com,sports.com,tmz.com,entertainment.com'  # Exclude sports/entertainment
+}
+
+UPSTREAM_HEADERS = {'User-Agent': 'Mindsy-Community-News-App/1.0'}
+
+# Upstream queries run in parallel; the deadline bounds a whole refill, not a single call
+NEWS_FETCH_WORKERS = int(os.environ.get('NEWS_FETCH_WORKERS', 10))
+NEWS_FETCH_DEADLINE = float(os.environ.get('NEWS_FETCH_DEADLINE', 12))
+UPSTREAM_POOL = ThreadPoolExecutor(max_workers=NEWS_FETCH_WORKERS, thread_name_prefix='news-fetch')
+
+# Latency of the most recent call per (provider, query), in seconds
+UPSTREAM_LATENCIES = {}
+UPSTREAM_ATTEMPT_SECONDS = METRICS.histogram(
+    'mindly_upstream_attempt_duration_seconds', 'Latency of single upstream HTTP attempts by outcome',
+    ('provider', 'query', 'status'))
+UPSTREAM_FETCH_SECONDS = METRICS.histogram(
+    'mindly_upstream_fetch_duration_seconds', 'Latency of upstream fetches including retries', ('provider', 'query'))
+
+def observe_upstream_attempt(provider, params, status, seconds):
+    UPSTREAM_ATTEMPT_SECONDS.observe(seconds, provider=provider, query=params.get('q', ''), status=str(status))
 
-    if cache_key in NEWS_CACHE:
-        cached_data, cached_time = NEWS_CACHE[cache_key]
-        if datetime.now(timezone.utc) - cached_time < NEWS_CACHE_DURATION:
-            print(f"📰 Returning cached community news ({len(cached_data)} articles)")
-            return cached_data
+# Base URLs are configurable so the fetchers can be pointed at a local fake server
+NEWSAPI_URL = os.environ.get('NEWSAPI_URL', 'https://newsapi.org/v2/everything')
+GUARDIAN_URL = os.environ.get('GUARDIAN_URL', 'https://content.guardianapis.com/search')
+
+UPSTREAM = UpstreamClient(
+    headers=UPSTREAM_HEADERS,
+    timeout=(float(os.environ.get('UPSTREAM_CONNECT_TIMEOUT', 3.05)), float(os.environ.get('UPSTREAM_READ_TIMEOUT', 10))),
+    retries=int(os.environ.get('UPSTREAM_RETRIES', 2)),
+    pool_size=NEWS_FETCH_WORKERS,
+    failure_threshold=int(os.environ.get('UPSTREAM_FAILURE_THRESHOLD', 5)),
+    reset_timeout=float(os.environ.get('UPSTREAM_RESET_SECONDS', 60)),
+    observer=observe_upstream_attempt
+)
+
+# Metered request budgets per provider; a limit of 0 disables that window.
+# With the sqlite cache backend they are kept in the cache file, shared by every
+# worker and across restarts; with the memory backend each process has its own
+# and before_fork() splits them between the workers.
+# The NewsAPI default is the free plan's 100 requests a day, fewer than the default
+# refresh schedule makes (see planned_newsapi_requests()); the refreshers slow down
+# as it drains, so raise it to match a paid plan rather than lower the feed TTLs.
+QUOTA_STORE = NEWS_CACHE if NEWS_CACHE_BACKEND == 'sqlite' else None
+NEWSAPI_DAILY_QUOTA = int(os.environ.get('NEWSAPI_DAILY_QUOTA', 100))
+UPSTREAM_QUOTAS = {
+    'newsapi': QuotaBudget({
+        'day': (NEWSAPI_DAILY_QUOTA, 86400),
+        'hour': (int(os.environ.get('NEWSAPI_HOURLY_QUOTA', 0)), 3600)
+    }, store=QUOTA_STORE, name='newsapi'),
+    'guardian': QuotaBudget({
+        'day': (int(os.environ.get('GUARDIAN_DAILY_QUOTA', 500)), 86400),
+        'hour': (int(os.environ.get('GUARDIAN_HOURLY_QUOTA', 0)), 3600)
+    }, store=QUOTA_STORE, name='guardian')
+}
+# Feeds refresh less often once less than QUOTA_LOW_WATER of the NewsAPI budget is left
+QUOTA_LOW_WATER = float(os.environ.get('QUOTA_LOW_WATER', 0.5))
+QUOTA_MAX_STRETCH = float(os.environ.get('QUOTA_MAX_STRETCH', 8))
+
+# NewsAPI answers 429 once the plan's quota is used up, so retrying only burns more of it
+NEWSAPI_RETRY_STATUSES = UpstreamClient.RETRY_STATUSES - {429}
+
+# Articles each query contributes to its feed, so the budget goes to the best queries first
+QUERY_YIELDS = QueryYields()
+
+def fetch_newsapi_articles(query, since=None, params=None):
+    """Fetch raw articles for one NewsAPI query, optionally only those published since a time"""
+    try:
+        params = {**NEWSAPI_PARAMS, **(params or {}), 'q': query, 'apiKey': NEWS_API_KEY}
+        if since:
+            params['from'] = since.isoformat(timespec='seconds')
+        
+        upstream_log.debug("🔍 Fetching news for query: %s", query)
+        data = UPSTREAM.get_json('newsapi', NEWSAPI_URL, params=params, budget=NEWS_FETCH_DEADLINE,
+                                 quota=UPSTREAM_QUOTAS['newsapi'], retry_statuses=NEWSAPI_RETRY_STATUSES)
+        if data.get('articles'):
+            upstream_log.info("✅ Found %d articles for query: %s", len(data['articles']), query, extra={'sampled': True})
+            return data['articles']
+    
+    except CircuitOpen:
+        upstream_log.warning("⏭️ Skipping NewsAPI query while the provider is failing: %s", query)
+    except UpstreamError as e:
+        if e.status == 429:
+            UPSTREAM_QUOTAS['newsapi'].exhaust()
+        upstream_log.error("❌ NewsAPI error %s for query: %s (%s)", e.status or '', query, e)
+    except Exception:
+        upstream_log.exception("Error fetching news for query '%s'", query)
     
-    all_articles = []
+    return []
+
+def fetch_guardian_articles(query, since=None, section='society|environment|education', budget=None):
+    """Fetch Guardian search results mapped to the NewsAPI article shape, within `budget` seconds"""
+    guardian_articles = []
     
     try:
-        community_queries = [
-            'community volunteer charity kindness',
-            'neighbors helping local support',
-            'food bank donation fundraiser nonprofit',
-            'good samaritan random act kindness',
-            'community garden clean up beautification',
-            'mentorship tutoring youth program',
-            'disaster relief mutual aid recovery',
-            'senior center elderly care support',
-            'community comes together unity'
-        ]
+        guardian_params = {
+            'q': query,
+            'section': section,
+            'page-size': 20,
+            'show-fields': 'headline,trailText,thumbnail,short-url',
+            'order-by': 'newest'
+        }
+        if since:
+            guardian_params['from-date'] = since.date().isoformat()
         
-        headers = {'User-Agent': 'Mindsy-Community-News-App/1.0'}
+        data = UPSTREAM.get_json('guardian', GUARDIAN_URL, params=guardian_params, budget=budget or NEWS_FETCH_DEADLINE,
+                                 quota=UPSTREAM_QUOTAS['guardian'])
         
-        for query in community_queries:
-            try:
-                if NEWS_API_KEY and NEWS_API_KEY != 'your-news-api-key-here':
-                    url = f"https://newsapi.org/v2/everything"
-                    params = {
-                        'q': query,
-                        'language': 'en',
-                        'sortBy': 'publishedAt',
-                        'pageSize': 15,
-                        'apiKey': NEWS_API_KEY,
-                        'excludeDomains': 'espn.com,sports.com,tmz.com,entertainment.com'  # Exclude sports/entertainment
-                    }
-                    
-                    print(f"🔍 Fetching community news for query: {query}")
-                    response = requests.get(url, params=params, headers=headers, timeout=10)
-                    if response.status_code == 200:
-                        data = response.json()
-                        if data.get('articles'):
-                            all_articles.extend(data['articles'])
-                            print(f"✅ Found {len(data['articles'])} articles for query: {query}")
-                    else:
-                        print(f"❌ NewsAPI error {response.status_code} for query: {query}")
-                
-            except Exception as e:
-                print(f"Error fetching news for query '{query}': {e}")
-                continue
-        if not all_articles:
-            print("📰 Trying Guardian API for community news...")
+        for item in data.get('response', {}).get('results', []):
+            article = {
+                'title': item.get('webTitle', ''),
+                'description': item.get('fields', {}).get('trailText', ''),
+                'url': item.get('fields', {}).get('short-url', item.get('webUrl', '')),
+                'urlToImage': item.get('fields', {}).get('thumbnail', ''),
+                'publishedAt': item.get('webPublicationDate', ''),
+                'source': {'name': 'The Guardian'}
+            }
+            guardian_articles.append(article)
+        
+        upstream_log.info("✅ Found %d articles from Guardian", len(guardian_articles), extra={'sampled': True})
+            
+    except CircuitOpen:
+        upstream_log.warning("⏭️ Skipping Guardian API while the provider is failing")
+    except UpstreamError as e:
+        if e.status == 429:
+            UPSTREAM_QUOTAS['guardian'].exhaust()
+        upstream_log.error("❌ Guardian API error %s: %s", e.status or '', e)
+    except Exception:
+        upstream_log.exception("Error fetching from Guardian API")
+    
+    return guardian_articles
+
+def timed_fetch(provider, query, fetch, *args):
+    """Run one upstream fetch and record how long it took"""
+    started = time.perf_counter()
+    try:
+        return fetch(query, *args)
+    finally:
+        elapsed = time.perf_counter() - started
+        UPSTREAM_LATENCIES[(provider, query)] = elapsed
+        UPSTREAM_FETCH_SECONDS.observe(elapsed, provider=provider, query=query)
+        upstream_log.debug("⏱️ %s '%s' took %.0f ms", provider, query, elapsed * 1000)
+
+def fetch_upstream_articles(feed, since=None, deadline=None):
+    """Fan out all of a feed's NewsAPI queries in parallel and collect what arrives before the deadline.
+
+    Returns a list of (source_key, articles) batches. `since` maps source keys
+    to the newest publishedAt already ingested for them. The Guardian query is
+    only sent, within what is left of the deadline, when NewsAPI returned
+    nothing. Each request is reserved against its provider's quota budget
+    before it is queued and refunded if it is cancelled before being sent.
+    NewsAPI queries run highest-yield first, so when the budget runs short it
+    is the least productive ones that wait.
+    """
+    deadline = NEWS_FETCH_DEADLINE if deadline is None else deadline
+    give_up_at = time.monotonic() + deadline
+    since = since or {}
+    
+    newsapi_futures = []
+    if NEWS_API_KEY and NEWS_API_KEY != 'your-news-api-key-here':
+        queries = {feed.source_key('newsapi', query): query for query in feed.newsapi_queries}
+        for source_key in QUERY_YIELDS.rank(queries):
+            if not UPSTREAM_QUOTAS['newsapi'].try_spend():
+                upstream_log.warning("🪙 NewsAPI budget exhausted, skipping %d %s queries", len(queries) - len(newsapi_futures), feed.name)
+                break
+            query = queries[source_key]
+            future = UPSTREAM_POOL.submit(
+                contextvars.copy_context().run, timed_fetch, 'newsapi', query, fetch_newsapi_articles, since.get(source_key), feed.newsapi_params
+            )
+            newsapi_futures.append((source_key, query, future))
+    wait([future for _, _, future in newsapi_futures], timeout=deadline)
+    
+    batches = []
+    for source_key, query, future in newsapi_futures:
+        if future.done():
+            batches.append((source_key, future.result()))
+            continue
+        if future.cancel():
+            UPSTREAM_QUOTAS['newsapi'].refund()
+        upstream_log.warning("⌛ Deadline hit before NewsAPI answered query: %s", query)
+    
+    if not any(articles for _, articles in batches):
+        upstream_log.info("📰 Trying Guardian API for %s news...", feed.name)
+        left = give_up_at - time.monotonic()
+        if left <= 0:
+            upstream_log.warning("⌛ No time left to ask the Guardian API")
+        elif not UPSTREAM_QUOTAS['guardian'].try_spend():
+            upstream_log.warning("🪙 Guardian API budget exhausted")
+        else:
+            guardian_key = feed.source_key('guardian', feed.guardian_query)
+            guardian_future = UPSTREAM_POOL.submit(
+                contextvars.copy_context().run, timed_fetch, 'guardian', feed.guardian_query, fetch_guardian_articles,
+                since.get(guardian_key), feed.guardian_section, left
+            )
+            wait([guardian_future], timeout=left)
+            if guardian_future.done():
+                batches.append((guardian_key, guardian_future.result()))
+            else:
+                if guardian_future.cancel():
+                    UPSTREAM_QUOTAS['guardian'].refund()
+                upstream_log.warning("⌛ Deadline hit before Guardian API answered")
+    
+    return batches
+
+def record_query_yields(kept_by_source):
+    """Remember how many articles each query's batch contributed to the feed"""
+    for source_key, kept in kept_by_source.items():
+        QUERY_YIELDS.record(source_key, kept)
+
+def load_watermarks(source_keys):
+    """Newest publishedAt ingested so far for each source key"""
+    rows = IngestWatermark.query.filter(IngestWatermark.source_key.in_(source_keys)).all()
+    return {row.source_key: row.last_published_at for row in rows}
+
+def ingest_articles(batches, feed):
+    """Store unseen articles and score unseen ones for this feed.
+
+    Every article is scored at most once per feed. Returns how many feed
+    entries were added and, per source key, how many of its batch's
+    articles the feed keeps (already-scored ones included).
+    """
+    candidates = {}
+    batch_hashes = {}
+    for source_key, articles in batches:
+        hashes = batch_hashes.setdefault(source_key, set())
+        for article in articles:
+            url = normalize_article_url(article.get('url') or '')
+            if url and article.get('title'):
+                url_hash = hash_article_url(url)
+                candidates.setdefault(url_hash, (url, article))
+                hashes.add(url_hash)
+    
+    stored = {}
+    url_hashes = list(candidates)
+    for start in range(0, len(url_hashes), MAX_BATCH_CHECK_URLS):
+        chunk = url_hashes[start:start + MAX_BATCH_CHECK_URLS]
+        stored.update((article.url_hash, article) for article in Article.query.filter(Article.url_hash.in_(chunk)))
+    
+    # article id -> whether the feed keeps it, for articles this feed already scored
+    in_feed = {}
+    stored_ids = [article.id for article in stored.values()]
+    for start in range(0, len(stored_ids), MAX_BATCH_CHECK_URLS):
+        chunk = stored_ids[start:start + MAX_BATCH_CHECK_URLS]
+        in_feed.update(db.session.query(FeedEntry.article_id, FeedEntry.included).filter(
+            FeedEntry.feed == feed.name,
+            FeedEntry.article_id.in_(chunk)
+        ))
+    kept = {url_hash for url_hash, article in stored.items() if in_feed.get(article.id)}
+    
+    unseen = [(url_hash, url, article) for url_hash, (url, article) in candidates.items() if url_hash not in stored]
+    unscored = [
+        (url_hash, article) for url_hash, (_, article) in candidates.items()
+        if url_hash not in stored or stored[url_hash].id not in in_feed
+    ]
+    
+    # Community scores and category tags live on the article itself (personalization uses them)
+    community_scores = COMMUNITY_PROFILE.score_many([article for _, _, article in unseen])
+    categories = match_categories_many([article for _, _, article in unseen])
+    for (url_hash, url, article), (community_score, is_community_story), article_categories in zip(
+            unseen, community_scores, categories):
+        stored[url_hash] = Article.from_upstream(article, url, url_hash, community_score, is_community_story)
+        if is_community_story:
+            stored[url_hash].categories = [ArticleCategory(category=category) for category in article_categories]
+    new_articles = len(unseen)
+    
+    new_entries = []
+    if feed.profile is COMMUNITY_PROFILE:
+        # Same profile as the article columns just filled in; don't score twice
+        feed_scores = [(stored[url_hash].sentiment_score, stored[url_hash].community_focus) for url_hash, _ in unscored]
+    else:
+        feed_scores = feed.profile.score_many([article for _, article in unscored])
+    for (url_hash, _), (sentiment_score, keep) in zip(unscored, feed_scores):
+        new_entries.append(FeedEntry(feed=feed.name, article=stored[url_hash],
+                                     sentiment_score=sentiment_score, included=keep))
+        if keep:
+            kept.add(url_hash)
+    kept_by_source = {source_key: len(hashes & kept) for source_key, hashes in batch_hashes.items()}
+    
+    for source_key, articles in batches:
+        published = [parse_published_at(article.get('publishedAt')) for article in articles]
+        published = [value for value in published if value]
+        if not published:
+            continue
+        watermark = db.session.get(IngestWatermark, source_key)
+        if watermark is None:
+            db.session.add(IngestWatermark(source_key=source_key, last_published_at=max(published)))
+        elif max(published) > watermark.last_published_at:
+            watermark.last_published_at = max(published)
+    
+    db.session.add_all(new_entries)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Another worker stored some of the same articles first; keep the rest
+        db.session.rollback()
+        for entry in new_entries:
+            db.session.add(entry)
             try:
-                guardian_url = "https://content.guardianapis.com/search"
-                guardian_params = {
-                    'q': 'community AND (volunteer OR charity OR kindness OR helping OR support)',
-                    'section': 'society|environment|education',
-                    'page-size': 20,
-                    'show-fields': 'headline,trailText,thumbnail,short-url',
-                    'order-by': 'newest'
-                }
-                
-                response = requests.get(guardian_url, params=guardian_params, headers=headers, timeout=10)
-                if response.status_code == 200:
-                    data = response.json()
-                    guardian_articles = []
-                    
-                    for item in data.get('response', {}).get('results', []):
-                        article = {
-                            'title': item.get('webTitle', ''),
-                            'description': item.get('fields', {}).get('trailText', ''),
-                            'url': item.get('fields', {}).get('short-url', item.get('webUrl', '')),
-                            'urlToImage': item.get('fields', {}).get('thumbnail', ''),
-                            'publishedAt': item.get('webPublicationDate', ''),
-                            'source': {'name': 'The Guardian'}
-                        }
-                        guardian_articles.append(article)
-                    
-                    all_articles.extend(guardian_articles)
-                    print(f"✅ Found {len(guardian_articles)} articles from Guardian")
-                    
-            except Exception as e:
-                print(f"Error fetching from Guardian API: {e}")
+                db.session.commit()
+            except IntegrityError:
+                db.session.rollback()
     
-    except Exception as e:
-        print(f"Error in fetch_feel_good_news: {e}")
-
-    if not all_articles:
-        print("📰 No articles found from APIs, creating sample community articles...")
-        all_articles = [
-            {
-                'title': 'Local Neighbors Organize Food Drive for Families in Need',
-                'description': 'Community volunteers collected over 2,000 meals to support local families facing food insecurity during tough times.',
-                'url': 'https://example.com/food-drive',
-                'urlToImage': '',
-                'publishedAt': datetime.now(timezone.utc).isoformat(),
-                'source': {'name': 'Community Herald'},
-                'sentiment_score': 0.9,
-                'community_focus': True
-            },
-            {
-                'title': 'Teenagers Start Tutoring Program for Younger Students',
-                'description': 'High school volunteers launch after-school program to help elementary students with homework and reading skills.',
-                'url': 'https://example.com/tutoring-program',
-                'urlToImage': '',
-                'publishedAt': datetime.now(timezone.utc).isoformat(),
-                'source': {'name': 'Local Education News'},
-                'sentiment_score': 0.8,
-                'community_focus': True
-            },
-            {
-                'title': 'Community Garden Brings Neighbors Together',
-                'description': 'Residents transform vacant lot into thriving garden space where families grow fresh vegetables and build friendships.',
-                'url': 'https://example.com/community-garden',
-                'urlToImage': '',
-                'publishedAt': datetime.now(timezone.utc).isoformat(),
-                'source': {'name': 'Neighborhood News'},
-                'sentiment_score': 0.7,
-                'community_focus': True
-            },
-            {
-                'title': 'Local Business Owner Starts Free Meal Program',
-                'description': 'Restaurant owner begins serving free lunches to seniors and low-income families every weekend.',
-                'url': 'https://example.com/free-meals',
-                'urlToImage': '',
-                'publishedAt': datetime.now(timezone.utc).isoformat(),
-                'source': {'name': 'Community Voice'},
-                'sentiment_score': 0.9,
-                'community_focus': True
-            }
-        ]
+    feeds_log.info("🗄️ %s: stored %d new articles, scored %d for the feed (%d already known)",
+                   feed.name, new_articles, len(new_entries), len(candidates) - len(new_entries))
+    return len(new_entries), kept_by_source
+
+def load_stored_feed(feed):
+    """Best recent stories a feed has kept, most positive first"""
+    cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - NEWS_ARCHIVE_WINDOW
+    rows = db.session.query(Article, FeedEntry.sentiment_score)\
+                     .join(FeedEntry, FeedEntry.article_id == Article.id)\
+                     .filter(FeedEntry.feed == feed.name,
+                             FeedEntry.included.is_(True),
+                             Article.published_at >= cutoff)\
+                     .order_by(FeedEntry.sentiment_score.desc(), Article.published_at.desc())\
+                     .limit(FEED_CANDIDATES)\
+                     .all()
+    
+    articles = []
+    for article, sentiment_score in rows:
+        data = article.to_dict()
+        data['sentiment_score'] = sentiment_score
+        articles.append(data)
+    return articles
+
+RESCORE_BATCH_SIZE = 2000
+
+def rescore_feed(feed, batch_size=RESCORE_BATCH_SIZE):
+    """Re-score a feed's stored articles, e.g. after its keyword lists change.
+
+    Articles are scored in batches with the batch scorer and all updates are
+    written in one transaction. Re-scoring the community feed also refreshes
+    the community score and category tags kept on every stored article.
+    Returns how many feed entries were scored.
+    """
+    rows = []
+    article_rows = []
+    category_rows = []
+    last_id = 0
+    while True:
+        query = db.session.query(Article.id, Article.title, Article.description, FeedEntry.article_id.label('entry'))\
+                          .outerjoin(FeedEntry, and_(FeedEntry.article_id == Article.id, FeedEntry.feed == feed.name))\
+                          .filter(Article.id > last_id)
+        if feed is not COMMUNITY_FEED:
+            query = query.filter(FeedEntry.article_id.isnot(None))
+        batch = query.order_by(Article.id).limit(batch_size).all()
+        if not batch:
+            break
+        last_id = batch[-1].id
+        
+        articles = [{'title': row.title, 'description': row.description} for row in batch]
+        scores = feed.profile.score_many(articles)
+        for row, (sentiment_score, keep) in zip(batch, scores):
+            if row.entry is not None:
+                rows.append({'feed': feed.name, 'article_id': row.id,
+                             'sentiment_score': sentiment_score, 'included': keep})
+        
+        if feed is COMMUNITY_FEED:
+            community_scores = scores if feed.profile is COMMUNITY_PROFILE else COMMUNITY_PROFILE.score_many(articles)
+            for row, (sentiment_score, keep), categories in zip(
+                    batch, community_scores, match_categories_many(articles)):
+                article_rows.append({'id': row.id, 'sentiment_score': sentiment_score, 'community_focus': keep})
+                if keep:
+                    category_rows.extend({'category': category, 'article_id': row.id} for category in categories)
+    
+    try:
+        if rows:
+            db.session.execute(db.update(FeedEntry), rows)
+        if feed is COMMUNITY_FEED:
+            if article_rows:
+                db.session.execute(db.update(Article), article_rows)
+            ArticleCategory.query.delete()
+            if category_rows:
+                db.session.execute(db.insert(ArticleCategory), category_rows)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    
+    feeds_log.info("🧮 Re-scored %d stored articles in the %s feed", len(rows), feed.name)
+    return len(rows)
+
+def sample_community_articles():
+    """Placeholder stories served when neither the APIs nor the article store have anything"""
+    return [
+        {
+            'title': 'Local Neighbors Organize Food Drive for Families in Need',
+            'description': 'Community volunteers collected over 2,000 meals to support local families facing food insecurity during tough times.',
+            'url': 'https://example.com/food-drive',
+            'urlToImage': '',
+            'publishedAt': datetime.now(timezone.utc).isoformat(),
+            'source': {'name': 'Community Herald'},
+            'sentiment_score': 0.9,
+            'community_focus': True
+        },
+        {
+            'title': 'Teenagers Start Tutoring Program for Younger Students',
+            'description': 'High school volunteers launch after-school program to help elementary students with homework and reading skills.',
+            'url': 'https://example.com/tutoring-program',
+            'urlToImage': '',
+            'publishedAt': datetime.now(timezone.utc).isoformat(),
+            'source': {'name': 'Local Education News'},
+            'sentiment_score': 0.8,
+            'community_focus': True
+        },
+        {
+            'title': 'Community Garden Brings Neighbors Together',
+            'description': 'Residents transform vacant lot into thriving garden space where families grow fresh vegetables and build friendships.',
+            'url': 'https://example.com/community-garden',
+            'urlToImage': '',
+            'publishedAt': datetime.now(timezone.utc).isoformat(),
+            'source': {'name': 'Neighborhood News'},
+            'sentiment_score': 0.7,
+            'community_focus': True
+        },
+        {
+            'title': 'Local Business Owner Starts Free Meal Program',
+            'description': 'Restaurant owner begins serving free lunches to seniors and low-income families every weekend.',
+            'url': 'https://example.com/free-meals',
+            'urlToImage': '',
+            'publishedAt': datetime.now(timezone.utc).isoformat(),
+            'source': {'name': 'Community Voice'},
+            'sentiment_score': 0.9,
+            'community_focus': True
+        }
+    ]
+
+NEWS_FLIGHTS = SingleFlight()
+
+FEED_LOOKUPS = METRICS.counter(
+    'mindly_feed_cache_lookups_total', 'Feed reads by whether the cached feed was fresh, stale or missing',
+    ('feed', 'result'))
+FEED_AGE = METRICS.gauge('mindly_feed_cache_age_seconds', 'Age of the feed served by the last read', ('feed',))
+FEED_STAGE_ARTICLES = METRICS.counter(
+    'mindly_feed_stage_articles_total', 'Articles coming out of each feed build stage', ('feed', 'stage'))
+FEED_STAGE_SECONDS = METRICS.histogram(
+    'mindly_feed_stage_duration_seconds', 'Time spent in each feed build stage', ('feed', 'stage'))
 
-    filtered_articles = filter_community_news(all_articles)
+@contextmanager
+def feed_stage(feed_name, stage):
+    """Time one stage of building a feed"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        FEED_STAGE_SECONDS.observe(time.perf_counter() - started, feed=feed_name, stage=stage)
+NEWS_REFRESHER_STOP = threading.Event()
+
+class FeedPipeline:
+    """A named news feed: what to fetch, how to filter it and how long it stays fresh.
 
-    unique_articles = []
-    seen_titles = set()
+    Every feed runs through the same fetch -> ingest -> rank -> dedup engine
+    with its own cache key, refresh schedule and fallback, so adding a feed is
+    a matter of configuration.
+    """
+    
+    def __init__(self, name, cache_key, newsapi_queries, guardian_query, profile, ttl,
+                 newsapi_params=None, guardian_section='society|environment|education', fallback=None):
+        self.name = name
+        self.cache_key = cache_key
+        self.newsapi_queries = newsapi_queries
+        self.guardian_query = guardian_query
+        self.profile = profile
+        self.ttl = ttl
+        self.newsapi_params = newsapi_params or {}
+        self.guardian_section = guardian_section
+        self.fallback = fallback
+        self._refresher = None
+        self._refresher_lock = threading.Lock()
     
-    for article in filtered_articles:
-        title_words = set(article.get('title', '').lower().split())
-        is_duplicate = False
+    def source_key(self, provider, query):
+        return f"{self.name}:{provider}:{query}"
+    
+    def fresh_for(self):
+        """How long a built feed counts as fresh, stretched while the NewsAPI budget runs low"""
+        return self.ttl * UPSTREAM_QUOTAS['newsapi'].stretch_factor(QUOTA_LOW_WATER, QUOTA_MAX_STRETCH)
+    
+    def build(self):
+        """Pull new articles into the store and build the feed from it"""
+        filtered_articles = []
         
-        for seen_title in seen_titles:
-            seen_words = set(seen_title.split())
-            if len(title_words & seen_words) / max(len(title_words), len(seen_words), 1) > 0.6:
-                is_duplicate = True
-                break
+        with app.app_context():
+            try:
+                source_keys = [self.source_key('newsapi', query) for query in self.newsapi_queries]
+                source_keys.append(self.source_key('guardian', self.guardian_query))
+                with feed_stage(self.name, 'fetch'):
+                    batches = fetch_upstream_articles(self, since=load_watermarks(source_keys))
+                FEED_STAGE_ARTICLES.inc(sum(len(articles) for _, articles in batches), feed=self.name, stage='fetch')
+                with feed_stage(self.name, 'ingest'):
+                    scored, kept_by_source = ingest_articles(batches, self)
+                    record_query_yields(kept_by_source)
+                FEED_STAGE_ARTICLES.inc(scored, feed=self.name, stage='ingest')
+            except Exception:
+                db.session.rollback()
+                feeds_log.exception("Error fetching %s news", self.name)
+            
+            try:
+                with feed_stage(self.name, 'load'):
+                    filtered_articles = load_stored_feed(self)
+                FEED_STAGE_ARTICLES.inc(len(filtered_articles), feed=self.name, stage='load')
+            except Exception:
+                feeds_log.exception("Error reading stored articles")
+        
+        if not filtered_articles and self.fallback:
+            feeds_log.warning("📰 No %s articles found from APIs, using fallback articles...", self.name)
+            with feed_stage(self.name, 'fallback'):
+                filtered_articles = self.fallback()
+            FEED_STAGE_ARTICLES.inc(len(filtered_articles), feed=self.name, stage='fallback')
         
-        if not is_duplicate:
-            seen_titles.add(article.get('title', '').lower())
-            unique_articles.append(article)
+        with feed_stage(self.name, 'dedup'):
+            unique_articles = dedupe_articles(filtered_articles, threshold=DEDUP_OVERLAP_THRESHOLD)[:FEED_SIZE]
+        FEED_STAGE_ARTICLES.inc(len(unique_articles), feed=self.name, stage='dedup')
+        
+        feeds_log.info("📰 Final result: %d unique %s articles", len(unique_articles), self.name)
+        
+        return unique_articles
     
-    print(f"📰 Final result: {len(unique_articles)} unique community-focused articles")
-    NEWS_CACHE[cache_key] = (unique_articles, datetime.now(timezone.utc))
+    def refresh(self):
+        """Rebuild the cached feed; concurrent callers share a single upstream fetch"""
+        def rebuild():
+            lease = f"refresh:{self.cache_key}"
+            owns_lease = NEWS_CACHE.acquire_lease(lease, ttl=NEWS_FETCH_DEADLINE + 30)
+            if not owns_lease:
+                # Another worker process is already rebuilding; serve what it last stored
+                cached = NEWS_CACHE.get(self.cache_key)
+                if cached:
+                    return cached[0]
+            
+            try:
+                articles = self.build()
+                NEWS_CACHE.set(self.cache_key, articles, (self.fresh_for() + NEWS_CACHE_STALE_FOR).total_seconds())
+            finally:
+                if owns_lease:
+                    NEWS_CACHE.release_lease(lease)
+            return articles
+        
+        return NEWS_FLIGHTS.do(self.cache_key, rebuild)
+    
+    def refresh_in_background(self):
+        """Start a refresh on its own thread unless one is already running"""
+        if NEWS_FLIGHTS.in_flight(self.cache_key):
+            return
+        
+        def run():
+            try:
+                self.refresh()
+            except Exception:
+                feeds_log.exception("Error refreshing %s news in background", self.name)
+        
+        # Carry the triggering request's id into the refresh's log lines
+        threading.Thread(target=contextvars.copy_context().run, args=(run,),
+                         name=f"news-refresh-{self.name}", daemon=True).start()
     
-    return unique_articles
+    def refresher_loop(self):
+        """Keep the feed warm by rebuilding it shortly before it expires"""
+        refreshed = False
+        
+        while not NEWS_REFRESHER_STOP.is_set():
+            refresh_after = self.fresh_for().total_seconds() * NEWS_REFRESH_AHEAD
+            cached = NEWS_CACHE.get(self.cache_key)
+            if cached:
+                age = (datetime.now(timezone.utc) - cached[1]).total_seconds()
+                wait_seconds = refresh_after - age
+            else:
+                wait_seconds = 0
+            
+            if wait_seconds <= 0 and refreshed:
+                # The last attempt did not produce a newer feed (failed, or another
+                # worker holds the refresh lease), so back off before trying again
+                wait_seconds = NEWS_REFRESH_RETRY
+            
+            if wait_seconds > 0:
+                refreshed = False
+                NEWS_REFRESHER_STOP.wait(wait_seconds)
+                continue
+            
+            try:
+                feeds_log.info("🔄 Refreshing %s news ahead of expiry", self.name)
+                self.refresh()
+            except Exception:
+                feeds_log.exception("Error in %s news refresher", self.name)
+            refreshed = True
+    
+    def start_refresher(self):
+        """Start this feed's background refresher thread once per process"""
+        with self._refresher_lock:
+            if self._refresher is None or not self._refresher.is_alive():
+                self._refresher = threading.Thread(target=self.refresher_loop,
+                                                   name=f"news-refresher-{self.name}", daemon=True)
+                self._refresher.start()
+    
+    def load(self):
+        """The feed and the time it was built, serving stale copies while a refresh runs"""
+        if NEWS_REFRESHER_ENABLED:
+            self.start_refresher()
+        
+        cached = NEWS_CACHE.get(self.cache_key)
+        if cached:
+            cached_data, cached_time = cached
+            age = datetime.now(timezone.utc) - cached_time
+            FEED_AGE.set(age.total_seconds(), feed=self.name)
+            if age < self.fresh_for():
+                FEED_LOOKUPS.inc(feed=self.name, result='fresh')
+                feeds_log.info("📰 Returning cached %s news (%d articles)", self.name, len(cached_data), extra={'sampled': True})
+                return cached_data, cached_time
+            
+            FEED_LOOKUPS.inc(feed=self.name, result='stale')
+            feeds_log.info("📰 Returning stale %s news (%d articles) while refreshing", self.name, len(cached_data),
+                           extra={'sampled': True})
+            self.refresh_in_background()
+            return cached_data, cached_time
+        
+        # Nothing to serve yet, so wait on the (shared) upstream fetch
+        FEED_LOOKUPS.inc(feed=self.name, result='miss')
+        FEED_AGE.set(0, feed=self.name)
+        articles = self.refresh()
+        cached = NEWS_CACHE.get(self.cache_key)
+        return articles, cached[1] if cached else datetime.now(timezone.utc)
+
+def fetch_feel_good_news():
+    """Return community-focused feel-good news"""
+    return COMMUNITY_FEED.load()[0]
+
+COMMUNITY_FEED = FeedPipeline(
+    name='community',
+    cache_key='community_feel_good_news',
+    newsapi_queries=COMMUNITY_QUERIES,
+    guardian_query=GUARDIAN_QUERY,
+    profile=COMMUNITY_PROFILE,
+    ttl=NEWS_CACHE_DURATION,
+    fallback=lambda: filter_community_news(sample_community_articles())
+)
+
+WORLD_FEED = FeedPipeline(
+    name='world',
+    cache_key='world_good_news',
+    newsapi_queries=WORLD_QUERIES,
+    guardian_query=WORLD_GUARDIAN_QUERY,
+    profile=WORLD_PROFILE,
+    ttl=WORLD_NEWS_CACHE_DURATION,
+    guardian_section='world|science|environment|global-development',
+    # Until world stories come in, show the community feed rather than nothing
+    fallback=fetch_feel_good_news
+)
+
+FEEDS = {feed.name: feed for feed in (COMMUNITY_FEED, WORLD_FEED)}
+
+@app.cli.command('rescore-feeds')
+def rescore_feeds_command():
+    """Re-score the stored article archive for every feed"""
+    for feed in FEEDS.values():
+        rescore_feed(feed)
+
+def planned_newsapi_requests():
+    """NewsAPI requests a day the refreshers make on their normal (unstretched) schedule"""
+    return round(sum(
+        len(feed.newsapi_queries) * 86400 / (feed.ttl.total_seconds() * NEWS_REFRESH_AHEAD)
+        for feed in FEEDS.values()
+    ))
+
+def start_news_refresher():
+    """Start a background refresher thread for every feed"""
+    NEWS_REFRESHER_STOP.clear()
+    for feed in FEEDS.values():
+        feed.start_refresher()
+
+def stop_news_refresher():
+    """Ask the background refresher threads to exit"""
+    NEWS_REFRESHER_STOP.set()
+
+def rank_stored_feed_for(preferences):
+    """Stored community stories ranked by how many of the given categories they match"""
+    cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - NEWS_ARCHIVE_WINDOW
+    matches = func.count(ArticleCategory.category).label('matches')
+    
+    rows = db.session.query(Article, matches)\
+                     .join(ArticleCategory, ArticleCategory.article_id == Article.id)\
+                     .filter(ArticleCategory.category.in_(preferences),
+                             Article.community_focus.is_(True),
+                             Article.published_at >= cutoff)\
+                     .group_by(Article.id)\
+                     .order_by(matches.desc(), Article.sentiment_score.desc(), Article.published_at.desc())\
+                     .limit(FEED_CANDIDATES)\
+                     .all()
+    
+    ranked = []
+    for article, match_count in rows:
+        data = article.to_dict()
+        data['preference_matches'] = match_count
+        ranked.append(data)
+    return ranked
+
+def fetch_personalized_news(preferences):
+    """Feel-good feed ranked for a set of news preferences, cached per distinct set"""
+    # Keeps the shared feed (and the article store behind it) fresh
+    general_feed = fetch_feel_good_news()
+    
+    preferences = sorted(set(preferences))
+    cache_key = f"personalized:{','.join(preferences)}"
+    cached = PERSONALIZED_FEEDS.get(cache_key)
+    if cached:
+        return cached[0]
+    
+    with app.app_context():
+        ranked = rank_stored_feed_for(preferences) if preferences else []
+    
+    # Top up with the general feed when few stories match the preferences
+    seen_urls = {article['url'] for article in ranked}
+    ranked += [article for article in general_feed if article['url'] not in seen_urls]
+    articles = dedupe_articles(ranked, threshold=DEDUP_OVERLAP_THRESHOLD)[:FEED_SIZE]
+    
+    PERSONALIZED_FEEDS.set(cache_key, articles, PERSONALIZED_FEED_TTL.total_seconds())
+    return articles
+
+# Serialized (and compressed) feed bodies, rebuilt only when the feed itself changes
+PREBUILT_FEEDS = {}
+PREBUILT_FEEDS_LOCK = threading.Lock()
+
+def feed_response(feed_name, focus, articles, generated_at):
+    """Serve a feed from its pre-serialized body, answering 304 when the client has it"""
+    with PREBUILT_FEEDS_LOCK:
+        prebuilt = PREBUILT_FEEDS.get((feed_name, focus))
+        if prebuilt is None or prebuilt[0] != generated_at:
+            with feed_stage(feed_name, 'serialize'):
+                body = app.json.dumps({
+                    'status': 'success',
+                    'articles': articles,
+                    'count': len(articles),
+                    'focus': focus,
+                    'timestamp': generated_at.isoformat()
+                }).encode('utf-8')
+            prebuilt = PREBUILT_FEEDS[(feed_name, focus)] = (generated_at, EncodedBody(body))
+    encoded = prebuilt[1]
+    
+    encoding = choose_encoding(request.accept_encodings)
+    # A tag from any variant means the client has this version of the feed
+    if encoded.matches(request.if_none_match):
+        response = Response(status=304)
+    else:
+        response = Response(encoded.get(encoding), mimetype='application/json')
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+    
+    response.set_etag(encoded.etag_for(encoding))
+    response.headers['Cache-Control'] = f'public, max-age={FEED_MAX_AGE}'
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response
+
+SAVED_ARTICLES_PAGE_SIZE = 50
+SAVED_ARTICLES_MAX_PAGE_SIZE = 200
+
+def encode_saved_articles_cursor(saved_at, article_id):
+    """Opaque keyset cursor pointing just past (saved_at, id)"""
+    raw = json.dumps([saved_at.isoformat(), article_id])
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+def decode_saved_articles_cursor(cursor):
+    try:
+        saved_at, article_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return datetime.fromisoformat(saved_at), int(article_id)
+    except (TypeError, binascii.Error, UnicodeError, json.JSONDecodeError) as e:
+        raise ValueError('Invalid cursor') from e
+
+# Keeps the IN (...) list well under SQLite's bound-parameter limit
+MAX_BATCH_CHECK_URLS = 200
 
 def validate_email(email):
     pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
@@ -421,7 +1630,41 @@ def validate_genres(genres):
     
     return all(genre in valid_genres for genre in genres)
 
+def validate_news_preferences(preferences):
+    """A list of distinct categories users can follow; empty resets to the defaults"""
+    if not isinstance(preferences, list) or len(preferences) > len(CATEGORY_KEYWORDS):
+        return False
+    return all(isinstance(category, str) and category in CATEGORY_KEYWORDS for category in preferences)
+
+
 
+def resolve_request_user(username=None, user_id=None):
+    """Id of the user a /api/users/<username>/... or /api/users/<id>/... request acts for.
+
+    Returns (user_id, None) or (None, error_response). A valid session token
+    is trusted without a database lookup but must belong to the user named
+    by `username` or `user_id`. Requests without a token fall back to looking
+    the user up, unless REQUIRE_SESSION_TOKEN is set.
+    """
+    token = bearer_token(request.headers.get('Authorization'))
+    if token:
+        payload = SESSION_TOKENS.verify(token)
+        if payload is None:
+            return None, (jsonify({'error': 'Invalid or expired session token'}), 401)
+        if (username is not None and payload['username'] != username) or \
+                (user_id is not None and payload['uid'] != user_id):
+            return None, (jsonify({'error': 'Not allowed to access this user'}), 403)
+        return payload['uid'], None
+    
+    if REQUIRE_SESSION_TOKEN:
+        return None, (jsonify({'error': 'Authorization required'}), 401)
+    
+    query = db.session.query(User.id)
+    query = query.filter_by(username=username) if username is not None else query.filter_by(id=user_id)
+    user_id = query.scalar()
+    if user_id is None:
+        return None, (jsonify({'error': 'User not found'}), 404)
+    return user_id, None
 
 @app.route('/api/users/<string:username>/saved-articles', methods=['POST', 'OPTIONS'])
 def save_article(username):
@@ -436,9 +1679,9 @@ def save_article(username):
         if not data:
             return jsonify({'error': 'No data provided'}), 400
 
-        user = User.query.filter_by(username=username).first()
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
+        user_id, error_response = resolve_request_user(username)
+        if error_response:
+            return error_response
 
         article_title = data.get('title', '').strip()
         article_url = data.get('url', '').strip()
@@ -446,16 +1689,8 @@ def save_article(username):
         if not article_title or not article_url:
             return jsonify({'error': 'Title and URL are required'}), 400
 
-        existing_saved = SavedArticle.query.filter_by(
-            user_id=user.id,
-            article_url=article_url
-        ).first()
-        
-        if existing_saved:
-            return jsonify({'error': 'Article already saved'}), 400
-
         saved_article = SavedArticle(
-            user_id=user.id,
+            user_id=user_id,
             article_title=article_title,
             article_description=data.get('description', ''),
             article_url=article_url,
@@ -465,16 +1700,21 @@ def save_article(username):
         )
         
         db.session.add(saved_article)
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # ix_saved_article_user_url_hash rejected a second save of the same URL
+            db.session.rollback()
+            return jsonify({'error': 'Article already saved'}), 400
         
         return jsonify({
             'message': 'Article saved successfully',
             'saved_article': saved_article.to_dict()
         }), 201
         
-    except Exception as e:
+    except Exception:
         db.session.rollback()
-        print(f"Error saving article: {e}")
+        http_log.exception("Error saving article")
         return jsonify({'error': 'Internal server error'}), 500
 
 @app.route('/api/users/<string:username>/saved-articles', methods=['GET', 'OPTIONS'])
@@ -483,26 +1723,71 @@ def get_saved_articles(username):
         return jsonify({}), 200
         
     try:
-        user = User.query.filter_by(username=username).first()
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
+        user_id, error_response = resolve_request_user(username)
+        if error_response:
+            return error_response
+        
+        try:
+            limit = int(request.args.get('limit', SAVED_ARTICLES_PAGE_SIZE))
+        except ValueError:
+            return jsonify({'error': 'limit must be an integer'}), 400
+        limit = max(1, min(limit, SAVED_ARTICLES_MAX_PAGE_SIZE))
+        
+        fields = None
+        if request.args.get('fields'):
+            fields = {field.strip() for field in request.args['fields'].split(',') if field.strip()}
+            unknown = fields - set(SavedArticle.FIELDS)
+            if unknown:
+                return jsonify({'error': f"Unknown fields: {', '.join(sorted(unknown))}"}), 400
+            # Always needed to build the next cursor
+            fields |= {'id', 'savedAt'}
         
-        saved_articles = SavedArticle.query.filter_by(user_id=user.id)\
-                                         .order_by(SavedArticle.saved_at.desc())\
-                                         .all()
+        query = SavedArticle.query.filter_by(user_id=user_id)
         
-        articles_data = [article.to_dict() for article in saved_articles]
+        cursor = request.args.get('cursor')
+        if cursor:
+            try:
+                cursor_saved_at, cursor_id = decode_saved_articles_cursor(cursor)
+            except ValueError:
+                return jsonify({'error': 'Invalid cursor'}), 400
+            query = query.filter(or_(
+                SavedArticle.saved_at < cursor_saved_at,
+                and_(SavedArticle.saved_at == cursor_saved_at, SavedArticle.id < cursor_id)
+            ))
+        
+        if fields is not None:
+            columns = [getattr(SavedArticle, SavedArticle.FIELDS[field][0]) for field in fields]
+            query = query.options(load_only(*columns))
+        
+        # Fetch one extra row to know whether another page exists
+        saved_articles = query.order_by(SavedArticle.saved_at.desc(), SavedArticle.id.desc())\
+                              .limit(limit + 1)\
+                              .all()
+        has_more = len(saved_articles) > limit
+        saved_articles = saved_articles[:limit]
+        
+        articles_data = [article.to_dict(fields) for article in saved_articles]
+        
+        next_cursor = None
+        if has_more:
+            last = saved_articles[-1]
+            next_cursor = encode_saved_articles_cursor(last.saved_at, last.id)
+        
+        total = db.session.query(func.count(SavedArticle.id))\
+                          .filter(SavedArticle.user_id == user_id)\
+                          .scalar()
         
         return jsonify({
             'status': 'success',
             'saved_articles': articles_data,
-            'count': len(articles_data),
+            'count': total,
+            'next_cursor': next_cursor,
             'username': username,
-            'user_id': user.id
+            'user_id': user_id
         }), 200
         
-    except Exception as e:
-        print(f"Error getting saved articles: {e}")
+    except Exception:
+        http_log.exception("Error getting saved articles")
         return jsonify({'error': 'Internal server error'}), 500
 
 @app.route('/api/users/<string:username>/saved-articles/<int:article_id>', methods=['DELETE', 'OPTIONS'])
@@ -512,12 +1797,12 @@ def unsave_article(username, article_id):
         
     try:
 
-        user = User.query.filter_by(username=username).first()
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
+        user_id, error_response = resolve_request_user(username)
+        if error_response:
+            return error_response
         saved_article = SavedArticle.query.filter_by(
             id=article_id, 
-            user_id=user.id
+            user_id=user_id
         ).first()
         
         if not saved_article:
@@ -530,9 +1815,9 @@ def unsave_article(username, article_id):
             'message': 'Article removed from saved articles'
         }), 200
         
-    except Exception as e:
+    except Exception:
         db.session.rollback()
-        print(f"Error removing saved article: {e}")
+        http_log.exception("Error removing saved article")
         return jsonify({'error': 'Internal server error'}), 500
 
 @app.route('/api/users/<string:username>/saved-articles/check', methods=['POST', 'OPTIONS'])
@@ -550,12 +1835,12 @@ def check_if_saved(username):
         if not article_url:
             return jsonify({'error': 'URL is required'}), 400
 
-        user = User.query.filter_by(username=username).first()
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
+        user_id, error_response = resolve_request_user(username)
+        if error_response:
+            return error_response
         saved_article = SavedArticle.query.filter_by(
-            user_id=user.id, 
-            article_url=article_url
+            user_id=user_id, 
+            article_url_hash=hash_article_url(article_url)
         ).first()
         
         return jsonify({
@@ -563,8 +1848,49 @@ def check_if_saved(username):
             'saved_article_id': saved_article.id if saved_article else None
         }), 200
         
-    except Exception as e:
-        print(f"Error checking saved status: {e}")
+    except Exception:
+        http_log.exception("Error checking saved status")
+        return jsonify({'error': 'Internal server error'}), 500
+
+@app.route('/api/users/<string:username>/saved-articles/check-batch', methods=['POST', 'OPTIONS'])
+def check_if_saved_batch(username):
+    if request.method == 'OPTIONS':
+        return jsonify({}), 200
+        
+    try:
+        if not request.is_json:
+            return jsonify({'error': 'Content-Type must be application/json'}), 400
+        
+        data = request.get_json()
+        urls = data.get('urls') if data else None
+        
+        if not isinstance(urls, list) or not all(isinstance(url, str) for url in urls):
+            return jsonify({'error': 'urls must be a list of strings'}), 400
+        
+        urls = list(dict.fromkeys(url.strip() for url in urls if url.strip()))
+        if len(urls) > MAX_BATCH_CHECK_URLS:
+            return jsonify({'error': f'At most {MAX_BATCH_CHECK_URLS} URLs can be checked at once'}), 400
+
+        user_id, error_response = resolve_request_user(username)
+        if error_response:
+            return error_response
+        
+        saved = {}
+        if urls:
+            hashes = {hash_article_url(url): url for url in urls}
+            rows = db.session.query(SavedArticle.article_url_hash, SavedArticle.id).filter(
+                SavedArticle.user_id == user_id,
+                SavedArticle.article_url_hash.in_(list(hashes))
+            ).all()
+            saved = {hashes[url_hash]: article_id for url_hash, article_id in rows}
+        
+        return jsonify({
+            'saved': saved,
+            'count': len(saved)
+        }), 200
+        
+    except Exception:
+        http_log.exception("Error checking saved status in batch")
         return jsonify({'error': 'Internal server error'}), 500
 
 # News API endpoints
@@ -574,21 +1900,13 @@ def get_feel_good_news():
         return jsonify({}), 200
         
     try:
-        print("📰 Fetching community-focused feel-good news...")
-        articles = fetch_feel_good_news()
-        print(f"✅ Returning {len(articles)} community articles")
-        
-        response_data = {
-            'status': 'success',
-            'articles': articles,
-            'count': len(articles),
-            'focus': 'community',
-            'timestamp': datetime.now(timezone.utc).isoformat()
-        }
+        http_log.info("📰 Fetching community-focused feel-good news...", extra={'sampled': True})
+        articles, generated_at = COMMUNITY_FEED.load()
+        http_log.info("✅ Returning %d community articles", len(articles), extra={'sampled': True})
         
-        return jsonify(response_data), 200
+        return feed_response(COMMUNITY_FEED.name, 'community', articles, generated_at)
     except Exception as e:
-        print(f"❌ Error getting community news: {e}")
+        http_log.exception("❌ Error getting community news")
         return jsonify({
             'status': 'error',
             'error': 'Failed to fetch community news',
@@ -596,30 +1914,98 @@ def get_feel_good_news():
         }), 500
     
 
-@app.route('/api/news/world-news', methods=['GET', 'OPTIONS'])
-def get_world_news():
+@app.route('/api/users/<string:username>/news/feel-good', methods=['GET', 'OPTIONS'])
+def get_personalized_news(username):
     if request.method == 'OPTIONS':
         return jsonify({}), 200
         
     try:
-        print("🌍 Fetching world news...")
-        articles = fetch_feel_good_news() 
+        user_id, error_response = resolve_request_user(username)
+        if error_response:
+            return error_response
+        
+        preferences = [category for (category,) in db.session.query(UserCategory.category).filter_by(
+            user_id=user_id, kind='preference'
+        ).order_by(UserCategory.position)] or list(DEFAULT_NEWS_PREFERENCES)
+        articles = fetch_personalized_news(preferences)
         
         return jsonify({
             'status': 'success',
             'articles': articles,
             'count': len(articles),
-            'focus': 'world',
+            'focus': 'personalized',
+            'preferences': preferences,
             'timestamp': datetime.now(timezone.utc).isoformat()
         }), 200
     except Exception as e:
-        print(f"❌ Error getting world news: {e}")
+        http_log.exception("❌ Error getting personalized news")
+        return jsonify({
+            'status': 'error',
+            'error': 'Failed to fetch personalized news',
+            'message': str(e)
+        }), 500
+
+@app.route('/api/news/world-news', methods=['GET', 'OPTIONS'])
+def get_world_news():
+    if request.method == 'OPTIONS':
+        return jsonify({}), 200
+        
+    try:
+        http_log.info("🌍 Fetching world news...", extra={'sampled': True})
+        articles, generated_at = WORLD_FEED.load()
+        
+        return feed_response(WORLD_FEED.name, 'world', articles, generated_at)
+    except Exception as e:
+        http_log.exception("❌ Error getting world news")
         return jsonify({
             'status': 'error',
             'error': 'Failed to fetch world news',
             'message': str(e)
         }), 500
 
+@app.route('/api/news/feeds/<string:name>', methods=['GET', 'OPTIONS'])
+def get_named_feed(name):
+    if request.method == 'OPTIONS':
+        return jsonify({}), 200
+    
+    feed = FEEDS.get(name)
+    if feed is None:
+        return jsonify({'error': 'Feed not found', 'feeds': sorted(FEEDS)}), 404
+        
+    try:
+        articles, generated_at = feed.load()
+        return feed_response(feed.name, feed.name, articles, generated_at)
+    except Exception as e:
+        http_log.exception("❌ Error getting %s news", name)
+        return jsonify({
+            'status': 'error',
+            'error': f'Failed to fetch {name} news',
+            'message': str(e)
+        }), 500
+
+@app.route('/api/news/upstream', methods=['GET', 'OPTIONS'])
+def get_upstream_stats():
+    """Quota budgets, per-query yields, breaker states and latencies for the news providers"""
+    if request.method == 'OPTIONS':
+        return jsonify({}), 200
+    
+    quotas = {}
+    for provider, budget in UPSTREAM_QUOTAS.items():
+        quotas[provider] = budget.snapshot()
+        quotas[provider]['fraction_remaining'] = round(budget.fraction_remaining(), 3)
+    
+    return jsonify({
+        'quotas': quotas,
+        'refresh_stretch': UPSTREAM_QUOTAS['newsapi'].stretch_factor(QUOTA_LOW_WATER, QUOTA_MAX_STRETCH),
+        'planned_newsapi_requests_per_day': planned_newsapi_requests(),
+        'query_yields': QUERY_YIELDS.snapshot(),
+        'breakers': UPSTREAM.breaker_states(),
+        'latency_ms': {
+            f"{provider}:{query}": round(seconds * 1000, 1)
+            for (provider, query), seconds in list(UPSTREAM_LATENCIES.items())
+        }
+    }), 200
+
 @app.route('/api/news/categories', methods=['GET', 'OPTIONS'])
 def get_news_categories():
     if request.method == 'OPTIONS':
@@ -639,6 +2025,42 @@ def get_news_categories():
         ]
     }), 200
 
+@app.route('/api/news/categories/<string:category>/users', methods=['GET', 'OPTIONS'])
+def get_category_users(category):
+    if request.method == 'OPTIONS':
+        return jsonify({}), 200
+        
+    try:
+        kind = request.args.get('kind', 'preference')
+        if kind not in ('preference', 'genre'):
+            return jsonify({'error': "kind must be 'preference' or 'genre'"}), 400
+        try:
+            limit = int(request.args.get('limit', USERS_PAGE_SIZE))
+            after_id = int(request.args.get('cursor', 0))
+        except ValueError:
+            return jsonify({'error': 'limit and cursor must be integers'}), 400
+        limit = max(1, min(limit, USERS_MAX_PAGE_SIZE))
+        
+        # Served entirely from ix_user_category_reverse
+        user_ids = [user_id for (user_id,) in db.session.query(UserCategory.user_id).filter(
+            UserCategory.kind == kind,
+            UserCategory.category == category,
+            UserCategory.user_id > after_id
+        ).order_by(UserCategory.user_id).limit(limit + 1)]
+        has_more = len(user_ids) > limit
+        user_ids = user_ids[:limit]
+        
+        return jsonify({
+            'category': category,
+            'kind': kind,
+            'user_ids': user_ids,
+            'count': len(user_ids),
+            'next_cursor': str(user_ids[-1]) if has_more else None
+        }), 200
+    except Exception:
+        http_log.exception("Error getting category users")
+        return jsonify({'error': 'Internal server error'}), 500
+
 @app.route('/api/users/<int:user_id>/news-preferences', methods=['PUT', 'OPTIONS'])
 def update_news_preferences(user_id):
     if request.method == 'OPTIONS':
@@ -649,9 +2071,16 @@ def update_news_preferences(user_id):
             return jsonify({'error': 'Content-Type must be application/json'}), 400
         
         data = request.get_json()
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Request body must be a JSON object'}), 400
         preferences = data.get('preferences', [])
+        if not validate_news_preferences(preferences):
+            return jsonify({'error': 'preferences must be a list of news categories'}), 400
         
-        user = User.query.get(user_id)
+        user_id, error_response = resolve_request_user(user_id=user_id)
+        if error_response:
+            return error_response
+        user = db.session.get(User, user_id)
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
@@ -663,7 +2092,8 @@ def update_news_preferences(user_id):
             'preferences': user.get_news_preferences()
         }), 200
         
-    except Exception as e:
+    except Exception:
+        http_log.exception("Error updating news preferences")
         db.session.rollback()
         return jsonify({'error': 'Internal server error'}), 500
 
@@ -672,7 +2102,7 @@ def test_cors():
     if request.method == 'OPTIONS':
         return jsonify({}), 200
         
-    print("🔍 CORS test endpoint called")
+    http_log.info("🔍 CORS test endpoint called")
     return jsonify({
         'status': 'success',
         'message': 'CORS is working correctly!',
@@ -680,6 +2110,44 @@ def test_cors():
         'headers_received': dict(request.headers)
     }), 200
 
+def collect_component_metrics():
+    """Scrape-time metrics read from the caches, quota budgets and circuit breakers"""
+    caches = {'news': NEWS_CACHE, 'personalized_feeds': PERSONALIZED_FEEDS, 'compressed_bodies': COMPRESSED_BODIES}
+    if SENTIMENT_SCORER is not None:
+        caches['sentiment'] = SENTIMENT_SCORER.cache
+    stats = {name: cache.stats() for name, cache in caches.items()}
+    yield ('mindly_cache_hits_total', 'counter', 'Cache lookups that found a live entry',
+           [({'cache': name}, cache_stats['hits']) for name, cache_stats in stats.items()])
+    yield ('mindly_cache_misses_total', 'counter', 'Cache lookups that found nothing',
+           [({'cache': name}, cache_stats['misses']) for name, cache_stats in stats.items()])
+    yield ('mindly_cache_evictions_total', 'counter', 'Entries evicted to stay within the size bound',
+           [({'cache': name}, cache_stats['evictions']) for name, cache_stats in stats.items()])
+    yield ('mindly_cache_entries', 'gauge', 'Entries currently held',
+           [({'cache': name}, len(cache)) for name, cache in caches.items()])
+    
+    remaining = []
+    spent = []
+    for provider, budget in UPSTREAM_QUOTAS.items():
+        snapshot = budget.snapshot()
+        remaining.extend(({'provider': provider, 'window': window}, state['remaining'])
+                         for window, state in snapshot['windows'].items())
+        spent.append(({'provider': provider, 'outcome': 'spent'}, snapshot['spent']))
+        spent.append(({'provider': provider, 'outcome': 'denied'}, snapshot['denied']))
+    yield ('mindly_upstream_quota_remaining', 'gauge', 'Requests left in each quota window', remaining)
+    yield ('mindly_upstream_quota_requests_total', 'counter', 'Requests charged to or refused by the quota budget', spent)
+    yield ('mindly_upstream_circuit_open', 'gauge', '1 while a provider is being skipped',
+           [({'provider': provider}, int(state != 'closed')) for provider, state in UPSTREAM.breaker_states().items()])
+    yield ('mindly_upstream_query_yield', 'gauge', 'Moving average of articles each query adds to its feed',
+           [({'source': source}, state['yield']) for source, state in QUERY_YIELDS.snapshot().items()])
+    yield ('mindly_log_records_dropped_total', 'counter', 'Log records dropped because the log queue was full',
+           [({}, LOG_HANDLER.dropped)])
+
+METRICS.register_collector(collect_component_metrics)
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return Response(METRICS.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
 @app.route('/api/health', methods=['GET', 'OPTIONS'])
 def health_check():
     if request.method == 'OPTIONS':
@@ -689,6 +2157,7 @@ def health_check():
         'status': 'healthy', 
         'message': 'Community News Backend is running!',
         'focus': 'community-centered feel-good news',
+        'upstream': UPSTREAM.breaker_states(),
         'timestamp': datetime.now(timezone.utc).isoformat()
     }), 200
 
@@ -727,7 +2196,10 @@ def signup():
         if User.query.filter_by(email=email).first():
             return jsonify({'error': 'Email already registered'}), 400
 
-        password_hash = generate_password_hash(password)
+        try:
+            password_hash = PASSWORDS.hash(password)
+        except HasherBusy:
+            return jsonify({'error': 'Server is busy, please try again'}), 503
         new_user = User(
             username=username,
             email=email,
@@ -738,27 +2210,20 @@ def signup():
         if genres:
             new_user.set_genres(genres)
 
-        new_user.set_news_preferences(['community', 'kindness', 'charity'])
+        new_user.set_news_preferences(DEFAULT_NEWS_PREFERENCES)
 
         db.session.add(new_user)
         db.session.commit()
 
         return jsonify({
             'message': 'User created successfully',
-            'user': {
-                'id': new_user.id,
-                'username': new_user.username,
-                'email': new_user.email,
-                'genres': new_user.get_genres(),
-                'profile_picture': new_user.profile_picture,
-                'news_preferences': new_user.get_news_preferences(),
-                'created_at': new_user.created_at.isoformat(),
-
-            }
+            'token': SESSION_TOKENS.issue(new_user.id, new_user.username),
+            'user': new_user.to_dict()
         }), 201
 
     except Exception as e:
         db.session.rollback()
+        http_log.exception("Error signing up")
         return jsonify({'error': f'Internal server error: {str(e)}'}), 500
 
 @app.route('/api/login', methods=['POST', 'OPTIONS'])
@@ -786,61 +2251,171 @@ def login():
         else:
             user = User.query.filter_by(username=login_field).first()
         
-        if not user or not check_password_hash(user.password_hash, password):
+        try:
+            password_ok = PASSWORDS.verify(user.password_hash if user else None, password)
+            stale_hash = password_ok and PASSWORDS.needs_rehash(user.password_hash)
+        except HasherBusy:
+            return jsonify({'error': 'Server is busy, please try again'}), 503
+        
+        if not password_ok:
             return jsonify({'error': 'Invalid username/email or password'}), 401
         
+        if stale_hash:
+            # Hash parameters changed since this password was stored; upgrade it now
+            try:
+                user.password_hash = PASSWORDS.hash(password)
+                db.session.commit()
+            except HasherBusy:
+                pass
+        
         return jsonify({
             'message': 'Login successful',
-            'user': {
-                'id': user.id,
-                'username': user.username,
-                'email': user.email,
-                'genres': user.get_genres(),
-                'profile_picture': user.profile_picture,
-                'news_preferences': user.get_news_preferences(),
-                'created_at': user.created_at.isoformat(),
-     
-            }
+            'token': SESSION_TOKENS.issue(user.id, user.username),
+            'user': user.to_dict()
         }), 200
         
-    except Exception as e:
+    except Exception:
+        http_log.exception("Error logging in")
         return jsonify({'error': 'Internal server error'}), 500
 
+USERS_PAGE_SIZE = 100
+USERS_MAX_PAGE_SIZE = 1000
+USERS_EXPORT_BATCH = 500
+
+def user_page_query(fields, after_id):
+    """Users with id > after_id in id order, loading only the columns behind `fields`"""
+    query = User.query.filter(User.id > after_id).order_by(User.id)
+    if fields is None or {'genres', 'news_preferences'} & fields:
+        # One extra query per page instead of one per user
+        query = query.options(selectinload(User.category_links))
+    if fields is not None:
+        columns = {User.FIELDS[field][0] for field in fields} - {'category_links'}
+        query = query.options(load_only(*[getattr(User, column) for column in columns]))
+    return query
+
 @app.route('/api/users', methods=['GET', 'OPTIONS'])
 def get_users():
     if request.method == 'OPTIONS':
         return jsonify({}), 200
         
     try:
-        users = User.query.all()
+        try:
+            limit = int(request.args.get('limit', USERS_PAGE_SIZE))
+            after_id = int(request.args.get('cursor', 0))
+        except ValueError:
+            return jsonify({'error': 'limit and cursor must be integers'}), 400
+        limit = max(1, min(limit, USERS_MAX_PAGE_SIZE))
+        
+        fields = None
+        if request.args.get('fields'):
+            fields = {field.strip() for field in request.args['fields'].split(',') if field.strip()}
+            unknown = fields - set(User.FIELDS)
+            if unknown:
+                return jsonify({'error': f"Unknown fields: {', '.join(sorted(unknown))}"}), 400
+            fields.add('id')
+        
+        if request.args.get('format') == 'ndjson':
+            # Stream every user one JSON object per line, a batch at a time
+            def generate():
+                last_id = after_id
+                while True:
+                    batch = user_page_query(fields, last_id).limit(USERS_EXPORT_BATCH).all()
+                    if not batch:
+                        break
+                    for user in batch:
+                        yield json.dumps(user.to_dict(fields)) + '\n'
+                    last_id = batch[-1].id
+                    db.session.expunge_all()
+            
+            return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+        
+        users = user_page_query(fields, after_id).limit(limit + 1).all()
+        has_more = len(users) > limit
+        users = users[:limit]
+        
         return jsonify({
-            'users': [{
-                'id': user.id,
-                'username': user.username,
-                'email': user.email,
-                'genres': user.get_genres(),
-                'profile_picture': user.profile_picture,
-                'news_preferences': user.get_news_preferences(),
-                'created_at': user.created_at.isoformat(),
-          
-            } for user in users]
+            'users': [user.to_dict(fields) for user in users],
+            'count': len(users),
+            'next_cursor': str(users[-1].id) if has_more else None
         }), 200
-    except Exception as e:
+    except Exception:
+        http_log.exception("Error listing users")
         return jsonify({'error': 'Internal server error'}), 500
 
-if __name__ == '__main__':
-    print("Starting Flask backend server for Community-Focused News...")
-    print(f"Database location: {db_path}")
-    
-    with app.app_context():
+def warm_feeds():
+    """Build every feed into the news cache unless a fresh copy is already there"""
+    for feed in FEEDS.values():
+        cached = NEWS_CACHE.get(feed.cache_key)
+        if cached and datetime.now(timezone.utc) - cached[1] < feed.fresh_for():
+            continue
         try:
-            db.create_all()
-            print("Database tables created successfully!")
-        except Exception as e:
-            print(f"Error creating database: {e}")
-            exit(1)
-    
+            articles = feed.refresh()
+            feeds_log.info("🔥 Warmed the %s feed (%d articles)", feed.name, len(articles))
+        except Exception:
+            feeds_log.exception("Error warming the %s feed", feed.name)
+
+def create_app(warm=None):
+    """The application, with its database ready and (unless WARM_FEEDS is false) its feeds built.
+
+    Launchers call this once in the parent process before forking workers, so
+    table creation, migrations and the first upstream fetch aren't repeated
+    per worker. Routes, models and feed pipelines are still bound to the
+    module-level app at import.
+    """
+    warm = WARM_FEEDS if warm is None else warm
+    planned = planned_newsapi_requests()
+    if NEWS_REFRESHER_ENABLED and 0 < NEWSAPI_DAILY_QUOTA < planned:
+        upstream_log.warning("🪙 Feed refreshes need about %d NewsAPI requests a day but NEWSAPI_DAILY_QUOTA is %d; "
+                             "refreshes will slow down as the budget drains", planned, NEWSAPI_DAILY_QUOTA)
+    with app.app_context():
+        db.create_all()
+        migrate_database()
+        if warm:
+            warm_feeds()
+    return app
+
+def before_fork(workers=1):
+    """Close the connections and pools the parent holds so workers don't inherit shared ones.
 
+    Upstream quotas not kept in a shared cache are split evenly between the
+    `workers` processes so together they stay within the provider's limits.
+    """
+    if QUOTA_STORE is None and workers > 1:
+        upstream_log.warning("⚠️ Splitting upstream quotas between %d workers; "
+                             "use NEWS_CACHE_BACKEND=sqlite to share them instead", workers)
+        for budget in UPSTREAM_QUOTAS.values():
+            budget.share(workers)
+    with app.app_context():
+        db.engine.dispose()
+    UPSTREAM.close()
+    NEWS_CACHE.close()
+    PASSWORDS.shutdown()
+
+def after_fork():
+    """Restart in a worker the threads fork doesn't carry over"""
+    global UPSTREAM_POOL
+    restart_logging_after_fork()
+    UPSTREAM_POOL = ThreadPoolExecutor(max_workers=NEWS_FETCH_WORKERS, thread_name_prefix='news-fetch')
+
+def shutdown_app():
+    """Stop background work before the process exits"""
+    stop_news_refresher()
+    UPSTREAM_POOL.shutdown(wait=False, cancel_futures=True)
+    PASSWORDS.shutdown()
+    UPSTREAM.close()
+    NEWS_CACHE.close()
 
+if __name__ == '__main__':
+    log.info("Starting Flask backend server for Community-Focused News...")
+    log.info("Database location: %s", db_path)
+    log.info("Development server only; run `python serve.py` for production")
+    
+    try:
+        # The reloader runs this twice, so leave feed warm-up to the first request
+        create_app(warm=False)
+        db_log.info("Database tables created successfully!")
+    except Exception:
+        db_log.exception("Error creating database")
+        exit(1)
     
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -0,0 +1,151 @@
+"""Bytes-on-wire and CPU cost of response compression per endpoint.
+
+Run from backend/:  python -m benchmarks.compression [--output results.json]
+
+Uses a throwaway SQLite database seeded with synthetic users, saved articles
+and stored feed articles; no upstream news API is contacted.
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+TMP_DIR = tempfile.mkdtemp(prefix='mindly-bench-')
+os.environ.setdefault('NEWS_API_KEY', 'benchmark')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(TMP_DIR, 'bench.db')}"
+os.environ['NEWS_REFRESHER_ENABLED'] = 'false'
+os.environ['PASSWORD_HASH_METHOD'] = 'pbkdf2:sha256:1000'
+os.environ['PASSWORD_HASH_WORKERS'] = '0'
+
+import app as backend  # noqa: E402
+from utils.compression import available_encodings, compress  # noqa: E402
+
+TITLE_WORDS = (
+    'library school garden shelter clinic park river coast harbor valley town village '
+    'students seniors nurses farmers artists veterans teens parents neighbors librarians '
+    'mural choir bakery orchard trail bridge playground kitchen pantry workshop studio'
+).split()
+
+DESCRIPTION = (
+    'Community volunteers gathered at the neighborhood food bank this weekend to sort donations, '
+    'pack meals for local families and plan the next fundraiser for the youth tutoring program.'
+)
+
+
+def seed(users=20, saved_per_user=40, articles=120):
+    backend.fetch_upstream_articles = lambda *args, **kwargs: []
+    now = datetime.now(timezone.utc).isoformat()
+
+    with backend.app.app_context():
+        backend.db.create_all()
+        for u in range(users):
+            user = backend.User(username=f'bench{u}', email=f'bench{u}@example.com',
+                                password_hash=backend.PASSWORDS.hash('benchmark'))
+            user.set_genres(['community', 'charity'])
+            user.set_news_preferences(['community', 'education'])
+            backend.db.session.add(user)
+        backend.db.session.flush()
+
+        for u in range(1, users + 1):
+            for i in range(saved_per_user):
+                backend.db.session.add(backend.SavedArticle(
+                    user_id=u,
+                    article_title=f'Neighbors rebuild playground together, part {i}',
+                    article_description=DESCRIPTION,
+                    article_url=f'https://news.example.com/{u}/{i}',
+                    article_image_url=f'https://img.example.com/{u}/{i}.jpg',
+                    article_source='Community Herald',
+                    article_published_at=now
+                ))
+
+        batch = [{
+            'title': 'Volunteers ' + ' '.join(random.Random(i).sample(TITLE_WORDS, 7)),
+            'description': DESCRIPTION,
+            'url': f'https://feed.example.com/story/{i}',
+            'urlToImage': f'https://img.example.com/story/{i}.jpg',
+            'publishedAt': now,
+            'source': {'name': 'Community Herald'}
+        } for i in range(articles)]
+        backend.db.session.commit()
+        backend.ingest_articles([('benchmark', batch)], backend.COMMUNITY_FEED)
+
+
+ENDPOINTS = [
+    ('feel-good', '/api/news/feel-good'),
+    ('saved-articles', '/api/users/bench0/saved-articles'),
+    ('users', '/api/users'),
+    ('categories', '/api/news/categories'),
+]
+
+
+def measure(client, path, encoding, rounds):
+    headers = {'Accept-Encoding': encoding} if encoding else {'Accept-Encoding': 'identity'}
+    response = client.get(path, headers=headers)
+    started = time.perf_counter()
+    for _ in range(rounds):
+        client.get(path, headers=headers)
+    return len(response.data), (time.perf_counter() - started) / rounds
+
+
+def compression_cpu(body, encoding, rounds):
+    started = time.process_time()
+    for _ in range(rounds):
+        compress(body, encoding)
+    return (time.process_time() - started) / rounds
+
+
+def run(rounds):
+    seed()
+    client = backend.app.test_client()
+    results = {}
+
+    for name, path in ENDPOINTS:
+        identity_bytes, identity_latency = measure(client, path, None, rounds)
+        body = client.get(path, headers={'Accept-Encoding': 'identity'}).data
+        endpoint = {'identity': {'bytes': identity_bytes, 'latency_ms': identity_latency * 1000}}
+
+        for encoding in available_encodings():
+            wire_bytes, latency = measure(client, path, encoding, rounds)
+            endpoint[encoding] = {
+                'bytes': wire_bytes,
+                'ratio': wire_bytes / identity_bytes if identity_bytes else 1.0,
+                'latency_ms': latency * 1000,
+                'compress_cpu_ms': compression_cpu(body, encoding, rounds) * 1000
+            }
+        results[name] = endpoint
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rounds', type=int, default=50)
+    parser.add_argument('--output', help='write results as JSON to this file')
+    args = parser.parse_args()
+
+    try:
+        results = run(args.rounds)
+    finally:
+        shutil.rmtree(TMP_DIR, ignore_errors=True)
+
+    for name, endpoint in results.items():
+        identity = endpoint['identity']
+        print(f"{name:<16} identity {identity['bytes']:>8} B  {identity['latency_ms']:7.2f} ms")
+        for encoding, stats in endpoint.items():
+            if encoding == 'identity':
+                continue
+            print(f"{'':<16} {encoding:<8} {stats['bytes']:>8} B  {stats['latency_ms']:7.2f} ms"
+                  f"  ratio {stats['ratio']:.2f}  cpu {stats['compress_cpu_ms']:.3f} ms")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'benchmark': 'compression', 'rounds': args.rounds, 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,180 @@
+"""Local stand-in for NewsAPI and the Guardian API.
+
+Serves /v2/everything and /search in each provider's response shape, with
+configurable latency and injected errors, so the upstream client and the
+feed pipelines can be exercised without network access or API quota. Point
+the app at it with NEWSAPI_URL=<base>/v2/everything and GUARDIAN_URL=<base>/search.
+
+Run from backend/:  python -m benchmarks.fake_upstream --port 8765 --latency 0.2 --error-rate 0.1
+"""
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+WORDS = [
+    'volunteers', 'neighbors', 'community', 'garden', 'library', 'students', 'donate',
+    'rescue', 'breakthrough', 'kindness', 'charity', 'families', 'shelter', 'mentors',
+    'renewable', 'wildlife', 'conservation', 'school', 'fundraiser', 'clinic'
+]
+
+
+class FakeUpstream:
+    """Fake news provider server; configuration can be changed while it runs"""
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, jitter=0.0, error_rate=0.0,
+                 error_status=503, articles=15, seed=1):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.articles = articles
+        self.requests = 0
+        self.errors = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name='fake-upstream', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _should_fail(self):
+        with self._lock:
+            self.requests += 1
+            fail = self._rng.random() < self.error_rate
+            if fail:
+                self.errors += 1
+            delay = self.latency + self._rng.uniform(0, self.jitter)
+        return fail, delay
+
+    def _stories(self, query):
+        # Stable per query, so repeated calls return the same articles (and ETag)
+        rng = random.Random(query)
+        now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+        stories = []
+        for i in range(self.articles):
+            slug = hashlib.sha1(f'{query}:{i}'.encode()).hexdigest()[:12]
+            stories.append({
+                'title': ' '.join(rng.sample(WORDS, 6)).capitalize(),
+                'description': ' '.join(rng.sample(WORDS, 12)),
+                'url': f'https://news.example.com/{slug}',
+                'image': f'https://img.example.com/{slug}.jpg',
+                'published': (now - timedelta(minutes=17 * i)).isoformat().replace('+00:00', 'Z')
+            })
+        return stories
+
+    def _newsapi(self, query):
+        return {
+            'status': 'ok',
+            'totalResults': self.articles,
+            'articles': [{
+                'source': {'id': None, 'name': 'Fake Wire'},
+                'title': story['title'],
+                'description': story['description'],
+                'url': story['url'],
+                'urlToImage': story['image'],
+                'publishedAt': story['published']
+            } for story in self._stories(query)]
+        }
+
+    def _guardian(self, query):
+        return {'response': {'status': 'ok', 'results': [{
+            'webTitle': story['title'],
+            'webUrl': story['url'],
+            'webPublicationDate': story['published'],
+            'fields': {'trailText': story['description'], 'thumbnail': story['image'], 'short-url': story['url']}
+        } for story in self._stories(query)]}}
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                query = parse_qs(parts.query).get('q', [''])[0]
+                if parts.path == '/v2/everything':
+                    build = fake._newsapi
+                elif parts.path == '/search':
+                    build = fake._guardian
+                else:
+                    self.send_error(404)
+                    return
+
+                fail, delay = fake._should_fail()
+                if delay:
+                    time.sleep(delay)
+                if fail:
+                    self.send_response(fake.error_status)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+
+                body = json.dumps(build(query)).encode()
+                etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+                if self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.end_headers()
+                    return
+
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.send_header('ETag', etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='extra random latency, up to this many seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of requests answered with an error')
+    parser.add_argument('--error-status', type=int, default=503)
+    parser.add_argument('--articles', type=int, default=15, help='articles per response')
+    args = parser.parse_args()
+
+    fake = FakeUpstream(args.host, args.port, args.latency, args.jitter, args.error_rate,
+                        args.error_status, args.articles)
+    print(f"Fake upstream on {fake.base_url} (NewsAPI: /v2/everything, Guardian: /search)")
+    try:
+        fake._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        fake._server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,304 @@
+"""End-to-end load test of the backend against a fake NewsAPI/Guardian.
+
+Run from backend/:  python -m benchmarks.load [--duration 20] [--concurrency 8] [--output load.json]
+
+Starts benchmarks.fake_upstream with the requested latency and error rate,
+serves app.py on a local threaded HTTP server backed by a throwaway SQLite
+database, and drives a weighted mix of feed, login and saved-article
+traffic from concurrent clients. Reports throughput and p50/p95/p99 per
+route, then micro-benchmarks filter_community_news and the dedup step.
+--compare prints how p95 and throughput moved against an earlier --output.
+"""
+import argparse
+import contextlib
+import json
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+
+import requests
+
+from benchmarks.fake_upstream import FakeUpstream
+
+PASSWORD = 'benchmark-password'
+
+# (route, weight); weights are relative shares of the request mix
+DEFAULT_MIX = [
+    ('GET /api/news/feel-good', 25),
+    ('GET /api/news/world-news', 10),
+    ('GET /api/users/<username>/news/feel-good', 5),
+    ('POST /api/login', 5),
+    ('POST /api/users/<username>/saved-articles', 10),
+    ('POST /api/users/<username>/saved-articles/check', 15),
+    ('POST /api/users/<username>/saved-articles/check-batch', 10),
+    ('GET /api/users/<username>/saved-articles', 20),
+]
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(fraction * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class Client:
+    """One simulated user issuing requests from the mix"""
+
+    def __init__(self, base_url, username, token, rng):
+        self.base_url = base_url
+        self.username = username
+        self.session = requests.Session()
+        self.session.headers['Authorization'] = f'Bearer {token}'
+        self.rng = rng
+        self.saved_urls = []
+        self.counter = 0
+
+    def _story_url(self):
+        self.counter += 1
+        return f'https://news.example.com/{self.username}/{self.counter}-{self.rng.randrange(10 ** 9)}'
+
+    def request(self, route):
+        user_path = f'/api/users/{self.username}'
+        if route == 'GET /api/news/feel-good':
+            return self.session.get(self.base_url + '/api/news/feel-good')
+        if route == 'GET /api/news/world-news':
+            return self.session.get(self.base_url + '/api/news/world-news')
+        if route == 'GET /api/users/<username>/news/feel-good':
+            return self.session.get(self.base_url + f'{user_path}/news/feel-good')
+        if route == 'POST /api/login':
+            return self.session.post(self.base_url + '/api/login',
+                                     json={'username': self.username, 'password': PASSWORD})
+        if route == 'POST /api/users/<username>/saved-articles':
+            url = self._story_url()
+            response = self.session.post(self.base_url + f'{user_path}/saved-articles', json={
+                'title': 'Neighbors plant a community orchard',
+                'description': 'Volunteers planted forty fruit trees for the local food bank.',
+                'url': url,
+                'urlToImage': 'https://img.example.com/orchard.jpg',
+                'source': {'name': 'Fake Wire'},
+                'publishedAt': datetime.now(timezone.utc).isoformat()
+            })
+            if response.status_code == 201:
+                self.saved_urls.append(url)
+            return response
+        if route == 'POST /api/users/<username>/saved-articles/check':
+            url = self.rng.choice(self.saved_urls) if self.saved_urls and self.rng.random() < 0.5 else self._story_url()
+            return self.session.post(self.base_url + f'{user_path}/saved-articles/check', json={'url': url})
+        if route == 'POST /api/users/<username>/saved-articles/check-batch':
+            urls = self.rng.sample(self.saved_urls, min(10, len(self.saved_urls)))
+            urls += [self._story_url() for _ in range(15 - len(urls))]
+            return self.session.post(self.base_url + f'{user_path}/saved-articles/check-batch', json={'urls': urls})
+        if route == 'GET /api/users/<username>/saved-articles':
+            return self.session.get(self.base_url + f'{user_path}/saved-articles', params={'limit': 20})
+        raise ValueError(f'Unknown route {route}')
+
+
+def drive(clients, mix, duration, seed):
+    """Run every client on its own thread for duration seconds; returns per-route samples"""
+    routes = [route for route, _ in mix]
+    weights = [weight for _, weight in mix]
+    samples = defaultdict(list)
+    statuses = defaultdict(lambda: defaultdict(int))
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration
+
+    def run(client, rng):
+        local = defaultdict(list)
+        local_statuses = defaultdict(lambda: defaultdict(int))
+        while time.perf_counter() < stop_at:
+            route = rng.choices(routes, weights)[0]
+            started = time.perf_counter()
+            try:
+                status = client.request(route).status_code
+            except requests.RequestException:
+                status = 'error'
+            local[route].append(time.perf_counter() - started)
+            local_statuses[route][status] += 1
+        with lock:
+            for route, values in local.items():
+                samples[route].extend(values)
+                for status, count in local_statuses[route].items():
+                    statuses[route][status] += count
+
+    threads = [
+        threading.Thread(target=run, args=(client, random.Random(seed + i)), daemon=True)
+        for i, client in enumerate(clients)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, statuses, time.perf_counter() - started
+
+
+def summarize(samples, statuses, elapsed):
+    routes = {}
+    for route in sorted(samples):
+        values = sorted(samples[route])
+        errors = sum(count for status, count in statuses[route].items()
+                     if status == 'error' or int(status) >= 500)
+        routes[route] = {
+            'requests': len(values),
+            'errors': errors,
+            'throughput_rps': len(values) / elapsed,
+            'mean_ms': sum(values) / len(values) * 1000,
+            'p50_ms': percentile(values, 0.50) * 1000,
+            'p95_ms': percentile(values, 0.95) * 1000,
+            'p99_ms': percentile(values, 0.99) * 1000,
+            'statuses': {str(status): count for status, count in sorted(statuses[route].items(), key=str)}
+        }
+    total = sum(len(values) for values in samples.values())
+    return {'total_requests': total, 'throughput_rps': total / elapsed, 'elapsed_s': elapsed, 'routes': routes}
+
+
+def micro_benchmarks(backend, articles, rounds):
+    """Per-call timings for the filter and dedup steps on a synthetic batch"""
+    from benchmarks.scoring import synthetic_articles
+    from utils.dedup import dedupe_articles
+
+    batch = synthetic_articles(articles)
+    results = {}
+
+    def best_of(fn):
+        best = float('inf')
+        for _ in range(rounds):
+            started = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - started)
+        return best
+
+    seconds = best_of(lambda: backend.filter_community_news([dict(article) for article in batch]))
+    results['filter_community_news'] = {'articles': len(batch), 'ms': seconds * 1000,
+                                        'us_per_article': seconds / len(batch) * 1e6}
+    seconds = best_of(lambda: backend.COMMUNITY_PROFILE.score_many(batch))
+    results['score_many'] = {'articles': len(batch), 'ms': seconds * 1000,
+                             'us_per_article': seconds / len(batch) * 1e6}
+    seconds = best_of(lambda: dedupe_articles(batch, threshold=backend.DEDUP_OVERLAP_THRESHOLD))
+    results['dedupe_articles'] = {'articles': len(batch), 'ms': seconds * 1000,
+                                  'us_per_article': seconds / len(batch) * 1e6}
+    return results
+
+
+def compare(current, previous_path):
+    with open(previous_path) as f:
+        previous = json.load(f)
+    print(f"\nCompared with {previous_path}:")
+    for route, stats in current['routes'].items():
+        before = previous.get('routes', {}).get(route)
+        if not before:
+            continue
+        p95 = (stats['p95_ms'] - before['p95_ms']) / before['p95_ms'] * 100 if before['p95_ms'] else 0.0
+        rps = (stats['throughput_rps'] - before['throughput_rps']) / before['throughput_rps'] * 100 \
+            if before['throughput_rps'] else 0.0
+        print(f"  {route:<56} p95 {p95:+6.1f}%  throughput {rps:+6.1f}%")
+
+
+def run(args):
+    tmp_dir = tempfile.mkdtemp(prefix='mindly-load-')
+    fake = FakeUpstream(latency=args.upstream_latency, jitter=args.upstream_jitter,
+                        error_rate=args.upstream_error_rate, seed=args.seed).start()
+    server = None
+    try:
+        os.environ.update({
+            'NEWS_API_KEY': 'benchmark',
+            'NEWSAPI_URL': f'{fake.base_url}/v2/everything',
+            'GUARDIAN_URL': f'{fake.base_url}/search',
+            'DATABASE_URL': f"sqlite:///{os.path.join(tmp_dir, 'load.db')}",
+            'NEWS_REFRESHER_ENABLED': 'false',
+            'NEWS_CACHE_MINUTES': str(args.feed_ttl),
+            'WORLD_NEWS_CACHE_MINUTES': str(args.feed_ttl),
+            'PASSWORD_HASH_METHOD': args.hash_method,
+        })
+        import app as backend
+        from werkzeug.serving import make_server
+        logging.getLogger('werkzeug').setLevel(logging.ERROR)
+
+        with backend.app.app_context():
+            backend.db.create_all()
+            backend.migrate_database()
+
+        server = make_server('127.0.0.1', 0, backend.app, threaded=True)
+        threading.Thread(target=server.serve_forever, name='load-server', daemon=True).start()
+        base_url = f'http://127.0.0.1:{server.server_port}'
+
+        clients = []
+        for i in range(args.concurrency):
+            username = f'load{i}'
+            response = requests.post(f'{base_url}/api/signup', json={
+                'username': username, 'email': f'{username}@example.com', 'password': PASSWORD
+            })
+            response.raise_for_status()
+            clients.append(Client(base_url, username, response.json()['token'], random.Random(args.seed + i)))
+
+        # Build both feeds before measuring so the first requests don't pay for the upstream fetch
+        requests.get(f'{base_url}/api/news/feel-good')
+        requests.get(f'{base_url}/api/news/world-news')
+        upstream_before = fake.requests
+
+        samples, statuses, elapsed = drive(clients, DEFAULT_MIX, args.duration, args.seed)
+        results = summarize(samples, statuses, elapsed)
+        results['upstream'] = {'requests': fake.requests - upstream_before, 'errors_injected': fake.errors}
+        results['micro'] = micro_benchmarks(backend, args.micro_articles, args.micro_rounds)
+        return results
+    finally:
+        if server is not None:
+            server.shutdown()
+        fake.stop()
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--duration', type=float, default=20, help='seconds of load')
+    parser.add_argument('--concurrency', type=int, default=8, help='concurrent simulated users')
+    parser.add_argument('--upstream-latency', type=float, default=0.05, help='fake upstream latency, seconds')
+    parser.add_argument('--upstream-jitter', type=float, default=0.05, help='extra random upstream latency, seconds')
+    parser.add_argument('--upstream-error-rate', type=float, default=0.0, help='fraction of upstream calls that fail')
+    parser.add_argument('--feed-ttl', type=float, default=0.25,
+                        help='feed freshness in minutes; short so refreshes happen during the run')
+    parser.add_argument('--hash-method', default='pbkdf2:sha256:600000', help='PASSWORD_HASH_METHOD for logins')
+    parser.add_argument('--micro-articles', type=int, default=2000)
+    parser.add_argument('--micro-rounds', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--verbose', action='store_true', help="show the app's own log output")
+    parser.add_argument('--output', help='write results as JSON to this file')
+    parser.add_argument('--compare', help='earlier --output file to compare against')
+    args = parser.parse_args()
+
+    if args.verbose:
+        results = run(args)
+    else:
+        # The app logs every fetch and request; keep the report readable
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            results = run(args)
+    results['config'] = {key: value for key, value in vars(args).items() if key not in ('output', 'compare', 'verbose')}
+
+    print(f"\n{'route':<56} {'reqs':>6} {'rps':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'err':>5}")
+    for route, stats in results['routes'].items():
+        print(f"{route:<56} {stats['requests']:>6} {stats['throughput_rps']:>7.1f} "
+              f"{stats['p50_ms']:>6.1f}ms {stats['p95_ms']:>6.1f}ms {stats['p99_ms']:>6.1f}ms {stats['errors']:>5}")
+    print(f"total {results['total_requests']} requests, {results['throughput_rps']:.1f} req/s; "
+          f"upstream calls {results['upstream']['requests']}")
+    for name, stats in results['micro'].items():
+        print(f"{name:<24} {stats['articles']:>6} articles  {stats['ms']:8.2f} ms  {stats['us_per_article']:7.2f} us/article")
+
+    if args.compare:
+        compare(results, args.compare)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'benchmark': 'load', **results}, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""Parity and speed of batch keyword scoring against the per-article scorer.
+
+Run from backend/:  python -m benchmarks.scoring [--articles 5000] [--output results.json]
+
+Scores a synthetic archive article by article and in one batch, and exits
+non-zero if any batch result differs from the scalar one. Needs no database
+or upstream API.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault('NEWS_API_KEY', 'benchmark')
+os.environ['NEWS_REFRESHER_ENABLED'] = 'false'
+os.environ.pop('SENTIMENT_MODEL_PATH', None)  # parity is checked for the keyword scorer
+
+import app as backend  # noqa: E402
+
+FILLER = (
+    'the a of in on at today city council report weekend residents family morning year '
+    'program plan new old school park river team local world people group event'
+).split()
+
+# Texts that exercise word boundaries, overlapping keywords, case and odd input
+EDGE_CASES = [
+    {'title': None, 'description': None},
+    {'title': '', 'description': ''},
+    {'title': 'Community garden opens', 'description': 'COMMUNITY Garden volunteers'},
+    {'title': 'Award for reward', 'description': 'not a war story'},
+    {'title': 'War ends', 'description': 'community comes together\nfood\ndrive'},
+    {'title': 'İstanbul volunteers', 'description': 'kindness, charity; support!'},
+    {'title': 'food bank food bank food bank', 'description': 'volunteer-led'},
+    {'title': 'Football charity match', 'description': 'fans donate to the food drive'},
+]
+
+
+def synthetic_articles(count, seed=7):
+    rng = random.Random(seed)
+    vocabulary = (
+        backend.COMMUNITY_POSITIVE_KEYWORDS + backend.WORLD_POSITIVE_KEYWORDS + backend.EXCLUDE_KEYWORDS +
+        [word for words in backend.CATEGORY_KEYWORDS.values() for word in words]
+    )
+    articles = list(EDGE_CASES)
+    while len(articles) < count:
+        def text(words):
+            picks = [rng.choice(vocabulary) if rng.random() < 0.15 else rng.choice(FILLER) for _ in range(words)]
+            return ' '.join(word.capitalize() if rng.random() < 0.2 else word for word in picks)
+        articles.append({'title': text(rng.randint(6, 12)), 'description': text(rng.randint(15, 35))})
+    return articles
+
+
+def check_parity(articles):
+    """List of mismatches between the scalar and batch paths"""
+    mismatches = []
+    texts = [backend.article_text(article) for article in articles]
+    matchers = {
+        'community': backend.COMMUNITY_MATCHER,
+        'world': backend.WORLD_PROFILE.matcher,
+        'categories': backend.CATEGORY_MATCHER,
+    }
+    for name, matcher in matchers.items():
+        batch = matcher.count_many(texts)
+        for index, text in enumerate(texts):
+            scalar = matcher.count(text)
+            batched = {group: counts[index] for group, counts in batch.items()}
+            if scalar != batched:
+                mismatches.append((name, text, scalar, batched))
+
+    for name, profile in (('community', backend.COMMUNITY_PROFILE), ('world', backend.WORLD_PROFILE)):
+        for article, batched in zip(articles, profile.score_many(articles)):
+            if profile.score(article) != batched:
+                mismatches.append((f'{name} score', article, profile.score(article), batched))
+
+    for article, batched in zip(articles, backend.match_categories_many(articles)):
+        if backend.match_categories(article) != batched:
+            mismatches.append(('categories', article, backend.match_categories(article), batched))
+
+    for article in articles:
+        text = backend.article_text(article)
+        if backend.community_sentiment_analysis(text) != backend.COMMUNITY_PROFILE.score(article)[0]:
+            mismatches.append(('community_sentiment_analysis', article, None, None))
+    return mismatches
+
+
+def timed(fn, rounds):
+    best = float('inf')
+    for _ in range(rounds):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--articles', type=int, default=5000)
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--output', help='write results as JSON to this file')
+    args = parser.parse_args()
+
+    articles = synthetic_articles(args.articles)
+    profile = backend.COMMUNITY_PROFILE
+
+    results = {}
+    scalar = timed(lambda: [profile.score(article) for article in articles], args.rounds)
+    print(f"{'scalar':<8} {scalar * 1000:9.1f} ms  {len(articles) / scalar:10.0f} articles/s")
+    results['scalar'] = {'seconds': scalar}
+
+    mismatches = check_parity(articles)
+    batch = timed(lambda: profile.score_many(articles), args.rounds)
+    print(f"{'batch':<8} {batch * 1000:9.1f} ms  {len(articles) / batch:10.0f} articles/s  "
+          f"x{scalar / batch:.1f}  parity {'ok' if not mismatches else f'FAILED ({len(mismatches)})'}")
+    for mismatch in mismatches[:5]:
+        print(f"  {mismatch}")
+    results['batch'] = {'seconds': batch, 'speedup': scalar / batch, 'mismatches': len(mismatches)}
+    failed = bool(mismatches)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'benchmark': 'scoring', 'articles': len(articles), 'results': results}, f, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
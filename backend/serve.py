@@ -0,0 +1,238 @@
+"""Production launcher: a pre-forking master with threaded or ASGI workers.
+
+Run from backend/:  python serve.py [--workers 4] [--threads 8] [--mode wsgi|asgi] [--port 5000]
+
+The master creates the database tables, applies migrations and warms the feed
+cache once, binds the listening socket and then forks the workers, which all
+accept on it. In wsgi mode each worker runs werkzeug's server with a fixed
+pool of request threads. In asgi mode each worker runs uvicorn (pip install
+uvicorn a2wsgi): connections, including slow and idle keep-alive ones, are
+held by the event loop and only requests being handled take a pool thread.
+
+Signals to the master: TERM or INT stop gracefully, letting workers finish
+the requests they have for up to --graceful-timeout seconds; HUP replaces
+every worker with a fresh one the same way. Workers that die are restarted.
+"""
+import argparse
+import logging
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+
+import app as backend
+from utils.logs import stop_logging
+
+log = logging.getLogger('mindly.server')
+
+# A worker exiting this soon after it started is treated as a crash loop and restarted more slowly
+MIN_WORKER_LIFETIME = 5
+
+
+class RequestHandler(WSGIRequestHandler):
+    # One request per connection, so an idle keep-alive client can't hold a pool thread
+    protocol_version = 'HTTP/1.0'
+    # Seconds a client may take to send its request before its thread is freed
+    timeout = 30
+
+
+class PooledWSGIServer(BaseWSGIServer):
+    """werkzeug's WSGI server handing accepted connections to a fixed pool of threads"""
+
+    multithread = True
+
+    def __init__(self, host, port, app, fd, threads):
+        super().__init__(host, port, app, handler=RequestHandler, fd=fd)
+        self.pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='http')
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._handle, request, client_address)
+
+    def _handle(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+
+def serve_wsgi(app, sock, args):
+    server = PooledWSGIServer(args.host, args.port, app, sock.fileno(), args.threads)
+
+    def stop(signum, frame):
+        # shutdown() waits for serve_forever(), which this handler interrupted, so call it elsewhere
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    server.serve_forever()
+    # Finish the connections already accepted; the master kills us if this overruns
+    server.pool.shutdown(wait=True)
+    server.server_close()
+
+
+def serve_asgi(app, sock, args):
+    import uvicorn
+    # a2wsgi's adapter when installed, else uvicorn's deprecated built-in one
+    from uvicorn.middleware.wsgi import WSGIMiddleware
+
+    config = uvicorn.Config(
+        WSGIMiddleware(app, workers=args.threads),
+        lifespan='off',
+        log_config=None,  # records go to the app's queue-backed logging
+        timeout_graceful_shutdown=args.graceful_timeout
+    )
+    # uvicorn installs its own TERM/INT handlers for a graceful stop
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+SERVERS = {'wsgi': serve_wsgi, 'asgi': serve_asgi}
+
+
+class Master:
+    """Forks and supervises the worker processes"""
+
+    def __init__(self, app, sock, args):
+        self.app = app
+        self.sock = sock
+        self.args = args
+        self.serve = SERVERS[args.mode]
+        self.workers = {}   # pid -> time started
+        self.retiring = {}  # pid -> time by which it must have exited
+        self.stopping = False
+        self.reload_requested = False
+
+    def spawn(self):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+                    signal.signal(signum, signal.SIG_DFL)
+                backend.after_fork()
+                self.serve(self.app, self.sock, self.args)
+            except BaseException:
+                log.exception("Worker %d crashed", os.getpid())
+                code = 1
+            finally:
+                backend.shutdown_app()
+                stop_logging()
+                os._exit(code)
+        self.workers[pid] = time.monotonic()
+        log.info("👷 Started worker %d", pid)
+
+    def reap(self):
+        while self.workers:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            started = self.workers.pop(pid, None)
+            if self.retiring.pop(pid, None) is not None or self.stopping:
+                continue
+            log.warning("⚠️ Worker %d exited with status %d", pid, os.waitstatus_to_exitcode(status))
+            if started is not None and time.monotonic() - started < MIN_WORKER_LIFETIME:
+                time.sleep(1)
+
+    def retire(self, pids):
+        deadline = time.monotonic() + self.args.graceful_timeout
+        for pid in pids:
+            self.retiring[pid] = deadline
+            self.signal(pid, signal.SIGTERM)
+
+    def signal(self, pid, signum):
+        try:
+            os.kill(pid, signum)
+        except ProcessLookupError:
+            pass
+
+    def kill_overdue(self):
+        now = time.monotonic()
+        for pid, deadline in list(self.retiring.items()):
+            if now >= deadline:
+                log.warning("⚠️ Worker %d did not stop in time, killing it", pid)
+                self.signal(pid, signal.SIGKILL)
+                self.retiring[pid] = float('inf')
+
+    def handle_stop(self, signum, frame):
+        self.stopping = True
+
+    def handle_reload(self, signum, frame):
+        self.reload_requested = True
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.handle_stop)
+        signal.signal(signal.SIGINT, self.handle_stop)
+        signal.signal(signal.SIGHUP, self.handle_reload)
+
+        while not self.stopping:
+            self.reap()
+            if self.reload_requested:
+                self.reload_requested = False
+                log.info("🔁 Replacing %d workers", len(self.workers) - len(self.retiring))
+                old = [pid for pid in self.workers if pid not in self.retiring]
+                for _ in range(self.args.workers):
+                    self.spawn()
+                self.retire(old)
+            while len(self.workers) - len(self.retiring) < self.args.workers and not self.stopping:
+                self.spawn()
+            self.kill_overdue()
+            time.sleep(0.5)
+
+        log.info("🛑 Stopping %d workers", len(self.workers))
+        self.retire([pid for pid in self.workers if pid not in self.retiring])
+        while self.workers:
+            self.reap()
+            self.kill_overdue()
+            time.sleep(0.1)
+        self.sock.close()
+        backend.shutdown_app()
+        log.info("👋 Server stopped")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default=os.environ.get('HOST', '0.0.0.0'))
+    parser.add_argument('--port', type=int, default=int(os.environ.get('PORT', 5000)))
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('WEB_WORKERS', os.cpu_count() or 1)))
+    parser.add_argument('--threads', type=int, default=int(os.environ.get('WEB_THREADS', 8)),
+                        help='request threads per worker')
+    parser.add_argument('--mode', choices=sorted(SERVERS), default=os.environ.get('WEB_MODE', 'wsgi'))
+    parser.add_argument('--graceful-timeout', type=float, default=float(os.environ.get('GRACEFUL_TIMEOUT', 30)),
+                        help='seconds a stopping worker gets to finish its requests')
+    parser.add_argument('--backlog', type=int, default=int(os.environ.get('LISTEN_BACKLOG', 2048)))
+    args = parser.parse_args()
+
+    if args.mode == 'asgi':
+        try:
+            import uvicorn  # noqa: F401
+        except ImportError:
+            parser.error('asgi mode needs uvicorn (pip install uvicorn a2wsgi)')
+
+    # Bind before warming up so a taken port fails fast instead of after the upstream fetch
+    sock = socket.create_server((args.host, args.port), backlog=args.backlog)
+    try:
+        app = backend.create_app()
+    except Exception:
+        log.exception("Error preparing the application")
+        stop_logging()
+        return 1
+    backend.before_fork(args.workers)
+
+    log.info("🚀 Serving on %s:%d with %d %s workers x %d threads",
+             args.host, sock.getsockname()[1], args.workers, args.mode, args.threads)
+    Master(app, sock, args).run()
+    stop_logging()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
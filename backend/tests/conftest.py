@@ -0,0 +1,24 @@
+import os
+import sys
+
+import pytest
+
+# Tests import the backend's modules (utils, benchmarks) the way app.py does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# app.py reads its configuration at import: no upstream key checks, background
+# refreshes or feed warm-up, an in-memory database and cheap inline password hashing
+os.environ.setdefault('NEWS_API_KEY', 'test')
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+os.environ['NEWS_REFRESHER_ENABLED'] = 'false'
+os.environ['WARM_FEEDS'] = 'false'
+os.environ['DATABASE_URL'] = 'sqlite://'
+os.environ['PASSWORD_HASH_METHOD'] = 'pbkdf2:sha256:1000'
+os.environ['PASSWORD_HASH_WORKERS'] = '0'
+
+
+@pytest.fixture(scope='session')
+def backend():
+    import app as backend
+    backend.create_app(warm=False)
+    return backend
@@ -0,0 +1,58 @@
+import pytest
+from werkzeug.security import generate_password_hash
+
+from utils.passwords import HasherBusy
+
+
+@pytest.fixture
+def client(backend):
+    return backend.app.test_client()
+
+
+def signup(client, username, password='secret123'):
+    response = client.post('/api/signup', json={
+        'username': username, 'email': f'{username}@example.com', 'password': password
+    })
+    assert response.status_code == 201
+    return response.get_json()
+
+
+def login(client, username, password='secret123'):
+    return client.post('/api/login', json={'username': username, 'password': password})
+
+
+def test_login_returns_a_session_token(client):
+    signup(client, 'alice')
+
+    response = login(client, 'alice')
+
+    assert response.status_code == 200
+    assert response.get_json()['token']
+    assert login(client, 'alice', 'wrong-password').status_code == 401
+    assert login(client, 'nobody').status_code == 401
+
+
+def test_login_rehashes_stale_passwords(backend, client):
+    signup(client, 'bruno')
+    with backend.app.app_context():
+        user = backend.User.query.filter_by(username='bruno').first()
+        user.password_hash = generate_password_hash('secret123', 'pbkdf2:sha256:2000')
+        backend.db.session.commit()
+
+    assert login(client, 'bruno').status_code == 200
+    with backend.app.app_context():
+        user = backend.User.query.filter_by(username='bruno').first()
+        assert not backend.PASSWORDS.needs_rehash(user.password_hash)
+
+
+def test_busy_hasher_is_a_503(backend, client, monkeypatch):
+    signup(client, 'carla')
+
+    def busy(*args):
+        raise HasherBusy()
+
+    monkeypatch.setattr(backend.PASSWORDS, 'needs_rehash', busy)
+    assert login(client, 'carla').status_code == 503
+
+    monkeypatch.setattr(backend.PASSWORDS, 'verify', busy)
+    assert login(client, 'carla').status_code == 503
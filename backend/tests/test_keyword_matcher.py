@@ -0,0 +1,64 @@
+import random
+
+import pytest
+
+from utils.keyword_matcher import KeywordMatcher
+
+GROUPS = {
+    'positive': ['community', 'volunteer', 'food bank', 'clean up', 'therapy dog', 'kindness'],
+    'exclude': ['war', 'football', 'box office', 'shooting'],
+    'tone': ['war', 'shooting'],
+    'overlap': ['community', 'food bank', 'barrier-free']
+}
+
+TEXTS = [
+    'Volunteers run the community food bank',
+    'A therapy dog visits; kindness wins the award',
+    'War reporting and a shooting near the football ground',
+    'Box office records: the community clean up drew crowds',
+    'The food banks reopened after the clean-up',
+    'A barrier-free playground for the COMMUNITY',
+    '',
+    None,
+]
+
+
+def random_texts(count, seed=7):
+    rng = random.Random(seed)
+    vocabulary = 'community volunteer food bank clean up war award reward box office the a of dog therapy'.split()
+    return [' '.join(rng.choice(vocabulary) for _ in range(rng.randint(0, 20))) for _ in range(count)]
+
+
+@pytest.fixture
+def matcher():
+    return KeywordMatcher(GROUPS)
+
+
+@pytest.mark.parametrize('texts', [TEXTS, random_texts(200), []], ids=['samples', 'random', 'empty'])
+def test_count_many_matches_count(matcher, texts):
+    expected = {name: [matcher.count(text)[name] for text in texts] for name in GROUPS}
+
+    assert matcher.count_many(texts) == expected
+
+
+def test_matches_whole_words_and_phrases(matcher):
+    found = matcher.find('Neighbors run the community food bank after the war award')
+
+    assert found['positive'] == {'community', 'food bank'}
+    assert found['exclude'] == {'war'}
+    assert found['overlap'] == {'community', 'food bank'}
+    assert matcher.count('The food bankers hand out rewards') == {name: 0 for name in GROUPS}
+
+
+def test_plural_forms_match_the_keyword(matcher):
+    found = matcher.find('Wars end as communities run food banks and clean ups')
+
+    assert found['exclude'] == {'war'}
+    assert found['positive'] == {'community', 'food bank', 'clean up'}
+    assert found['overlap'] == {'community', 'food bank'}
+
+
+def test_plural_of_a_phrase_only_on_its_last_word(matcher):
+    assert matcher.find('foods bank')['positive'] == set()
+    assert matcher.find('therapy dogs visit')['positive'] == {'therapy dog'}
+
@@ -0,0 +1,54 @@
+import time
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+from utils.passwords import HasherBusy, PasswordHasher
+
+METHOD = 'pbkdf2:sha256:1000'
+
+
+@pytest.fixture
+def hasher():
+    hasher = PasswordHasher(METHOD, workers=1, max_pending=1, timeout=5)
+    yield hasher
+    hasher.shutdown()
+
+
+def test_hash_and_verify(hasher):
+    pwhash = hasher.hash('correct horse')
+
+    assert hasher.verify(pwhash, 'correct horse')
+    assert not hasher.verify(pwhash, 'wrong horse')
+    assert not hasher.verify(None, 'correct horse')
+
+
+def test_needs_rehash_compares_expanded_methods():
+    hasher = PasswordHasher('pbkdf2', workers=0)
+
+    assert not hasher.needs_rehash(generate_password_hash('pw', 'pbkdf2'))
+    assert hasher.needs_rehash(generate_password_hash('pw', METHOD))
+    assert hasher.needs_rehash(generate_password_hash('pw', 'scrypt'))
+
+
+def test_full_queue_is_busy(hasher):
+    hasher._slots.acquire()
+    try:
+        with pytest.raises(HasherBusy):
+            hasher.hash('pw')
+    finally:
+        hasher._slots.release()
+
+
+def test_timeout_is_busy_and_keeps_the_slot_until_the_work_finishes(hasher):
+    hasher.hash('warm up the pool')
+    hasher.timeout = 0.05
+
+    with pytest.raises(HasherBusy):
+        hasher._run(time.sleep, 0.5)
+    with pytest.raises(HasherBusy):
+        hasher.hash('pw')
+
+    time.sleep(0.6)
+    hasher.timeout = 5
+    assert hasher.verify(hasher.hash('pw'), 'pw')
@@ -0,0 +1,106 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from benchmarks.fake_upstream import FakeUpstream
+from utils.news_cache import MemoryCache, SQLiteCache
+from utils.quota import QuotaBudget
+
+LIMITS = {'day': (10, 86400), 'hour': (0, 3600)}
+
+
+def test_budget_stops_at_the_tightest_window():
+    budget = QuotaBudget({'day': (10, 86400), 'hour': (3, 3600)})
+
+    assert [budget.try_spend() for _ in range(4)] == [True, True, True, False]
+    assert budget.snapshot()['spent'] == 3
+    assert budget.denied == 1
+
+
+def test_refund_gives_back_a_reservation():
+    budget = QuotaBudget(LIMITS)
+    budget.try_spend(10)
+    budget.refund()
+
+    assert budget.try_spend()
+    assert not budget.try_spend()
+    assert budget.spent == 10
+
+
+@pytest.mark.parametrize('store', ['memory', 'sqlite'])
+def test_budgets_with_the_same_store_share_tokens(store, tmp_path):
+    if store == 'memory':
+        cache = MemoryCache()
+    else:
+        cache = SQLiteCache(str(tmp_path / 'cache.db'))
+    first = QuotaBudget(LIMITS, store=cache, name='newsapi')
+    second = QuotaBudget(LIMITS, store=cache, name='newsapi')
+
+    granted = sum(budget.try_spend() for _ in range(8) for budget in (first, second))
+    second.refund()
+
+    assert granted == 10
+    assert first.try_spend()
+    first.exhaust()
+    assert not second.try_spend()
+    assert second.fraction_remaining() < 0.01
+
+
+def test_sqlite_budget_survives_a_restart(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    QuotaBudget(LIMITS, store=SQLiteCache(path), name='newsapi').try_spend(7)
+
+    restarted = QuotaBudget(LIMITS, store=SQLiteCache(path), name='newsapi')
+
+    assert restarted.snapshot()['windows']['day']['remaining'] == pytest.approx(3, abs=0.01)
+
+
+def test_share_splits_a_local_budget():
+    budget = QuotaBudget({'day': (100, 86400)})
+    budget.share(4)
+
+    assert sum(budget.try_spend() for _ in range(50)) == 25
+
+
+@pytest.fixture
+def upstreams(backend, monkeypatch):
+    with FakeUpstream() as newsapi, FakeUpstream() as guardian:
+        monkeypatch.setattr(backend, 'NEWSAPI_URL', newsapi.base_url + '/v2/everything')
+        monkeypatch.setattr(backend, 'GUARDIAN_URL', guardian.base_url + '/search')
+        for provider in ('newsapi', 'guardian'):
+            monkeypatch.setitem(backend.UPSTREAM_QUOTAS, provider, QuotaBudget({'day': (100, 86400)}))
+        yield newsapi, guardian
+
+
+def test_guardian_is_not_asked_when_newsapi_answers(backend, upstreams):
+    newsapi, guardian = upstreams
+
+    batches = backend.fetch_upstream_articles(backend.WORLD_FEED)
+
+    assert len(batches) == len(backend.WORLD_QUERIES)
+    assert newsapi.requests == backend.UPSTREAM_QUOTAS['newsapi'].spent == len(backend.WORLD_QUERIES)
+    assert guardian.requests == backend.UPSTREAM_QUOTAS['guardian'].spent == 0
+
+
+def test_guardian_is_charged_when_it_is_the_fallback(backend, upstreams):
+    newsapi, guardian = upstreams
+    newsapi.error_rate = 1.0
+    newsapi.error_status = 400
+
+    batches = backend.fetch_upstream_articles(backend.WORLD_FEED)
+
+    assert [key for key, _ in batches if key.startswith('world:guardian:')]
+    assert guardian.requests == backend.UPSTREAM_QUOTAS['guardian'].spent == 1
+
+
+def test_requests_cancelled_before_sending_are_refunded(backend, upstreams, monkeypatch):
+    newsapi, guardian = upstreams
+    newsapi.latency = 0.5
+    pool = ThreadPoolExecutor(max_workers=2)
+    monkeypatch.setattr(backend, 'UPSTREAM_POOL', pool)
+
+    backend.fetch_upstream_articles(backend.WORLD_FEED, deadline=0.2)
+    pool.shutdown(wait=True)
+
+    assert newsapi.requests == backend.UPSTREAM_QUOTAS['newsapi'].spent == 2
+    assert guardian.requests == 0
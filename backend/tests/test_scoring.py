@@ -0,0 +1,65 @@
+from datetime import datetime
+
+import pytest
+
+
+def headline(title):
+    return {'title': title, 'description': ''}
+
+
+@pytest.mark.parametrize('title', [
+    'Wildfires and floods: community volunteers rebuild after deadly shootings',
+    'Community rallies after wars and attacks; volunteers help',
+    'Local charity donations fall as earthquakes hit the region',
+    'Volunteers support families after plane crashes',
+])
+def test_plural_exclude_keywords_still_reject(backend, title):
+    assert backend.COMMUNITY_PROFILE.score(headline(title)) == (-1.0, False)
+
+
+@pytest.mark.parametrize('title, score', [
+    ('Communities collect donations for the food banks', 0.9),
+    ('Charities open new libraries', 0.6),
+    ('Neighbors share random acts of kindness', 0.6),
+])
+def test_plural_positive_keywords_count(backend, title, score):
+    sentiment_score, keep = backend.COMMUNITY_PROFILE.score(headline(title))
+
+    assert sentiment_score == pytest.approx(score)
+    assert keep
+
+
+def test_keywords_inside_other_words_do_not_match(backend):
+    assert backend.COMMUNITY_PROFILE.score(headline('Local volunteers win an award')) == (pytest.approx(0.9), True)
+
+
+def test_batch_scoring_matches_single_articles(backend):
+    articles = [headline(title) for title in (
+        'Wildfires and floods: community volunteers rebuild after deadly shootings',
+        'Communities collect donations for the food banks',
+        'Local volunteers win an award',
+        '',
+    )]
+
+    assert backend.COMMUNITY_PROFILE.score_many(articles) == [backend.COMMUNITY_PROFILE.score(a) for a in articles]
+
+
+def test_rescoring_the_community_feed_scores_each_article_once(backend, monkeypatch):
+    with backend.app.app_context():
+        backend.db.session.add_all([
+            backend.Article(url=f'https://news.example.com/rescore-{i}', url_hash=f'rescore-{i}',
+                            title='Communities collect donations for the food banks', description='',
+                            published_at=datetime(2026, 1, 1), sentiment_score=0.0, community_focus=False)
+            for i in range(3)
+        ])
+        backend.db.session.commit()
+        stored = backend.Article.query.count()
+
+        calls = []
+        score_many = backend.COMMUNITY_PROFILE.score_many
+        monkeypatch.setattr(backend.COMMUNITY_PROFILE, 'score_many',
+                            lambda articles: calls.append(len(articles)) or score_many(articles))
+        backend.rescore_feed(backend.COMMUNITY_FEED)
+
+        assert sum(calls) == stored
+        assert backend.Article.query.filter_by(url_hash='rescore-0').one().community_focus
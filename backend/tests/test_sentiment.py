@@ -0,0 +1,112 @@
+import json
+
+import pytest
+
+from utils.sentiment import CachedScorer, HashedNgramModel, Scorer, hashed_features, measure_latency
+
+POSITIVE = [
+    'volunteers rebuild the community garden',
+    'neighbors donate meals to families in need',
+    'students raise money for the local library',
+    'rescue team reunites a lost dog with its family',
+]
+NEGATIVE = [
+    'fire destroys homes and injures residents',
+    'crash on the highway leaves two dead',
+    'fraud scandal hits the city council',
+    'violence erupts after the disputed vote',
+]
+
+
+@pytest.fixture(scope='module')
+def model():
+    return HashedNgramModel.train(POSITIVE + NEGATIVE, [1] * len(POSITIVE) + [0] * len(NEGATIVE),
+                                  dim=2 ** 12, epochs=20)
+
+
+class CountingScorer(Scorer):
+    name = 'counting'
+
+    def __init__(self):
+        self.seen = []
+
+    def score_many(self, texts):
+        self.seen.extend(texts)
+        return [len(text or '') / 100 for text in texts]
+
+
+def test_features_are_unigrams_and_bigrams_in_stable_buckets():
+    features = hashed_features('Food bank opens', 2 ** 12)
+
+    assert len(features) == 5
+    assert features == hashed_features('food BANK opens!', 2 ** 12)
+    assert all(0 <= index < 2 ** 12 and sign in (1.0, -1.0) for index, sign in features)
+    assert hashed_features(None, 2 ** 12) == []
+
+
+def test_trained_model_separates_its_examples(model):
+    positive = model.score_many(POSITIVE)
+    negative = model.score_many(NEGATIVE)
+
+    assert all(0 < score <= 1 for score in positive)
+    assert all(-1 <= score < 0 for score in negative)
+
+
+def test_untrained_model_is_neutral():
+    assert HashedNgramModel({}).score_many(['anything', '']) == [0.0, 0.0]
+
+
+def test_save_and_load_round_trip(model, tmp_path):
+    path = tmp_path / 'model.json'
+    model.save(path)
+    loaded = HashedNgramModel.load(path)
+
+    assert loaded.dim == model.dim
+    assert loaded.score_many(POSITIVE + NEGATIVE) == pytest.approx(model.score_many(POSITIVE + NEGATIVE), abs=1e-4)
+
+
+def test_load_rejects_other_model_types(tmp_path):
+    path = tmp_path / 'model.json'
+    path.write_text(json.dumps({'type': 'something-else', 'dim': 8, 'bias': 0, 'weights': {}}))
+
+    with pytest.raises(ValueError):
+        HashedNgramModel.load(path)
+
+
+def test_cached_scorer_only_scores_misses_and_keeps_order():
+    inner = CountingScorer()
+    scorer = CachedScorer(inner, max_entries=10)
+    first = scorer.score_many(['aa', 'bbbb'])
+
+    scores = scorer.score_many(['cccccc', 'aa', 'bbbb', 'd'])
+
+    assert inner.seen == ['aa', 'bbbb', 'cccccc', 'd']
+    assert scores == [0.06] + first + [0.01]
+    assert scorer.cache.stats()['hits'] == 2
+
+
+def test_cached_scorer_is_bounded():
+    inner = CountingScorer()
+    scorer = CachedScorer(inner, max_entries=2)
+    scorer.score_many(['a', 'b', 'c'])
+    scorer.score_many(['a'])
+
+    assert inner.seen == ['a', 'b', 'c', 'a']
+    assert len(scorer.cache) == 2
+
+
+def test_latency_is_per_text(model):
+    assert 0 < measure_latency(model, POSITIVE, rounds=1) < 0.01
+
+
+def test_app_only_uses_a_model_that_loads_within_budget(backend, model, tmp_path, monkeypatch):
+    path = tmp_path / 'model.json'
+    model.save(path)
+    monkeypatch.setattr(backend, 'SENTIMENT_MODEL_PATH', str(path))
+    assert isinstance(backend.load_sentiment_scorer(), CachedScorer)
+
+    monkeypatch.setattr(backend, 'SENTIMENT_LATENCY_BUDGET_MS', 0)
+    assert backend.load_sentiment_scorer() is None
+
+    monkeypatch.setattr(backend, 'SENTIMENT_MODEL_PATH', str(tmp_path / 'missing.json'))
+    assert backend.load_sentiment_scorer() is None
@@ -0,0 +1,133 @@
+import pytest
+
+from benchmarks.fake_upstream import FakeUpstream
+from utils.quota import QuotaBudget
+from utils.upstream import CircuitOpen, UpstreamClient, UpstreamError
+
+
+@pytest.fixture
+def fake():
+    with FakeUpstream() as fake:
+        yield fake
+
+
+def make_client(**kwargs):
+    kwargs.setdefault('sleep', lambda seconds: None)
+    return UpstreamClient(**kwargs)
+
+
+def get(client, fake, query='kindness', **kwargs):
+    return client.get_json('newsapi', fake.base_url + '/v2/everything', {'q': query}, **kwargs)
+
+
+def test_retries_until_the_provider_recovers(fake):
+    fake.error_rate = 1.0
+
+    def recover(seconds):
+        fake.error_rate = 0.0
+
+    client = make_client(retries=2, sleep=recover)
+    body = get(client, fake)
+
+    assert len(body['articles']) == fake.articles
+    assert fake.requests == 2
+
+
+def test_gives_up_after_the_last_retry(fake):
+    fake.error_rate = 1.0
+    client = make_client(retries=2)
+
+    with pytest.raises(UpstreamError) as excinfo:
+        get(client, fake)
+
+    assert excinfo.value.status == 503
+    assert fake.requests == 3
+
+
+def test_refused_request_is_not_retried(fake):
+    fake.error_rate = 1.0
+    fake.error_status = 401
+    client = make_client(retries=2, failure_threshold=1)
+
+    with pytest.raises(UpstreamError) as excinfo:
+        get(client, fake)
+
+    assert excinfo.value.status == 401
+    assert fake.requests == 1
+    assert client.breaker_states() == {'newsapi': 'closed'}
+
+
+def test_retry_statuses_override(fake):
+    fake.error_rate = 1.0
+    fake.error_status = 429
+    client = make_client(retries=2)
+
+    with pytest.raises(UpstreamError) as excinfo:
+        get(client, fake, retry_statuses=UpstreamClient.RETRY_STATUSES - {429})
+
+    assert excinfo.value.status == 429
+    assert fake.requests == 1
+
+
+def test_circuit_opens_after_consecutive_failures(fake):
+    fake.error_rate = 1.0
+    client = make_client(retries=0, failure_threshold=2, reset_timeout=60)
+
+    for _ in range(2):
+        with pytest.raises(UpstreamError):
+            get(client, fake)
+    with pytest.raises(CircuitOpen):
+        get(client, fake)
+
+    assert fake.requests == 2
+    assert client.breaker_states() == {'newsapi': 'open'}
+
+
+def test_half_open_probe_closes_the_circuit(fake):
+    fake.error_rate = 1.0
+    client = make_client(retries=0, failure_threshold=1, reset_timeout=0)
+    with pytest.raises(UpstreamError):
+        get(client, fake)
+    assert client.breaker_states() == {'newsapi': 'half-open'}
+
+    fake.error_rate = 0.0
+    get(client, fake)
+
+    assert client.breaker_states() == {'newsapi': 'closed'}
+
+
+def test_not_modified_is_served_from_the_remembered_body(fake):
+    statuses = []
+    client = make_client(observer=lambda provider, params, status, seconds: statuses.append(status))
+
+    first = get(client, fake)
+    second = get(client, fake)
+
+    assert second == first
+    assert statuses == [200, 304]
+
+
+def test_every_retry_is_charged_to_the_quota(fake):
+    fake.error_rate = 1.0
+    quota = QuotaBudget({'day': (100, 86400)})
+    client = make_client(retries=2)
+
+    for query in ('kindness', 'charity', 'community'):
+        assert quota.try_spend()
+        with pytest.raises(UpstreamError):
+            get(client, fake, query=query, quota=quota)
+
+    assert fake.requests == quota.spent == 9
+
+
+def test_retrying_stops_when_the_quota_runs_out(fake):
+    fake.error_rate = 1.0
+    quota = QuotaBudget({'day': (2, 86400)})
+    client = make_client(retries=5)
+
+    assert quota.try_spend()
+    with pytest.raises(UpstreamError):
+        get(client, fake, quota=quota)
+
+    assert fake.requests == quota.spent == 2
+    assert quota.denied == 1
@@ -0,0 +1,71 @@
+import itertools
+
+import pytest
+
+
+def test_personalized_feeds_do_not_evict_shared_feeds(backend, monkeypatch):
+    monkeypatch.setattr(backend, 'fetch_feel_good_news', lambda: [])
+    backend.NEWS_CACHE.set('feed:shared', ['story'], 600)
+
+    categories = sorted(backend.CATEGORY_KEYWORDS)
+    preference_sets = [combo for size in range(1, len(categories) + 1)
+                       for combo in itertools.combinations(categories, size)]
+    assert len(preference_sets) > backend.NEWS_CACHE.max_entries
+    for preferences in preference_sets:
+        backend.fetch_personalized_news(list(preferences))
+
+    assert backend.NEWS_CACHE.get('feed:shared')[0] == ['story']
+    assert backend.PERSONALIZED_FEEDS.get(f"personalized:{','.join(categories)}") is not None
+
+
+@pytest.fixture
+def client(backend, monkeypatch):
+    monkeypatch.setattr(backend, 'REQUIRE_SESSION_TOKEN', True)
+    monkeypatch.setattr(backend, 'fetch_feel_good_news', lambda: [])
+    return backend.app.test_client()
+
+
+def signup(client, username):
+    response = client.post('/api/signup', json={
+        'username': username, 'email': f'{username}@example.com', 'password': 'secret123'
+    })
+    assert response.status_code == 201
+    body = response.get_json()
+    return body['user']['id'], {'Authorization': f"Bearer {body['token']}"}
+
+
+def test_personalized_feed_needs_the_users_token(client):
+    _, dana = signup(client, 'dana')
+    _, erin = signup(client, 'erin')
+
+    assert client.get('/api/users/dana/news/feel-good').status_code == 401
+    assert client.get('/api/users/dana/news/feel-good', headers=erin).status_code == 403
+    assert client.get('/api/users/dana/news/feel-good', headers=dana).status_code == 200
+
+
+def test_preference_updates_need_the_users_token(client):
+    frank_id, frank = signup(client, 'frank')
+    _, gwen = signup(client, 'gwen')
+    url = f'/api/users/{frank_id}/news-preferences'
+    body = {'preferences': ['kindness']}
+
+    assert client.put(url, json=body).status_code == 401
+    assert client.put(url, json=body, headers=gwen).status_code == 403
+    response = client.put(url, json=body, headers=frank)
+    assert response.status_code == 200
+    assert client.get('/api/users/frank/news/feel-good', headers=frank).get_json()['preferences'] == ['kindness']
+
+
+def test_saved_articles_need_the_users_token(client):
+    _, hana = signup(client, 'hana')
+
+    assert client.get('/api/users/hana/saved-articles').status_code == 401
+    assert client.get('/api/users/hana/saved-articles', headers=hana).status_code == 200
+
+
+def test_username_alone_is_accepted_only_with_the_flag_off(backend, client, monkeypatch):
+    signup(client, 'ivan')
+    assert client.get('/api/users/ivan/news/feel-good').status_code == 401
+
+    monkeypatch.setattr(backend, 'REQUIRE_SESSION_TOKEN', False)
+    assert client.get('/api/users/ivan/news/feel-good').status_code == 200
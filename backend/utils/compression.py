@@ -0,0 +1,64 @@
+import gzip
+import hashlib
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def available_encodings():
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def compress(body, encoding):
+    if encoding == 'gzip':
+        # mtime=0 keeps the output byte-identical for identical input
+        return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    raise ValueError(f'Unsupported encoding: {encoding}')
+
+
+def choose_encoding(accept_encodings):
+    """Best encoding the client accepts, or None for identity.
+
+    `accept_encodings` is werkzeug's request.accept_encodings.
+    """
+    best, best_quality = None, 0
+    for encoding in available_encodings():
+        quality = accept_encodings.quality(encoding)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class EncodedBody:
+    """A response body plus its compressed variants, each compressed at most once.
+
+    Every content-coding gets its own strong ETag ("<hash>" for identity,
+    "<hash>-gzip", "<hash>-br"), since the variants are different bytes.
+    """
+
+    def __init__(self, body):
+        self.body = body
+        self.etag = hashlib.sha256(body).hexdigest()[:32]
+        self._variants = {}
+
+    def etag_for(self, encoding):
+        return f'{self.etag}-{encoding}' if encoding else self.etag
+
+    def matches(self, if_none_match):
+        """True if werkzeug's request.if_none_match holds the tag of any variant"""
+        return any(if_none_match.contains(self.etag_for(encoding)) for encoding in (None,) + available_encodings())
+
+    def get(self, encoding):
+        if encoding is None:
+            return self.body
+        variant = self._variants.get(encoding)
+        if variant is None:
+            variant = self._variants[encoding] = compress(self.body, encoding)
+        return variant
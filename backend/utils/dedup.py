@@ -0,0 +1,83 @@
+import random
+import zlib
+
+_MERSENNE_PRIME = (1 << 61) - 1
+
+
+class NearDuplicateIndex:
+    """MinHash/LSH index for spotting near-duplicate token sets.
+
+    Each kept item is hashed into `bands` buckets. A new item is only compared
+    against items that share at least one bucket, and a pair counts as a
+    duplicate when |A & B| / max(|A|, |B|) > threshold, the same overlap rule
+    the feed has always used. With the default 24 bands of 2 rows a pair at
+    the 0.6 overlap boundary (Jaccard >= 0.43) is caught >99% of the time.
+    """
+
+    def __init__(self, threshold=0.6, bands=24, rows=2, seed=1):
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = rows
+
+        rng = random.Random(seed)
+        self._perms = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(bands * rows)
+        ]
+        self._buckets = [{} for _ in range(bands)]
+        self._items = []
+
+    def _signature(self, tokens):
+        # crc32 rather than hash(): str hashes are salted per process, which would
+        # make the buckets (and so borderline results) differ between workers
+        hashes = [zlib.crc32(token.encode('utf-8')) for token in tokens]
+        return [
+            min((a * h + b) % _MERSENNE_PRIME for h in hashes)
+            for a, b in self._perms
+        ]
+
+    def _band_keys(self, signature):
+        rows = self.rows
+        return [tuple(signature[i * rows:(i + 1) * rows]) for i in range(self.bands)]
+
+    def _find_match(self, tokens, band_keys):
+        checked = set()
+        for band, key in enumerate(band_keys):
+            for item_id in self._buckets[band].get(key, ()):
+                if item_id in checked:
+                    continue
+                checked.add(item_id)
+                other = self._items[item_id]
+                if len(tokens & other) / max(len(tokens), len(other), 1) > self.threshold:
+                    return item_id
+        return None
+
+    def add(self, tokens):
+        """Index tokens unless they duplicate an existing item; returns True if added"""
+        tokens = frozenset(tokens)
+        if not tokens:
+            # Nothing to compare on, so it can never be a duplicate
+            return True
+
+        band_keys = self._band_keys(self._signature(tokens))
+        if self._find_match(tokens, band_keys) is not None:
+            return False
+
+        item_id = len(self._items)
+        self._items.append(tokens)
+        for band, key in enumerate(band_keys):
+            self._buckets[band].setdefault(key, []).append(item_id)
+        return True
+
+    def __len__(self):
+        return len(self._items)
+
+
+def title_tokens(article):
+    return set((article.get('title') or '').lower().split())
+
+
+def dedupe_articles(articles, threshold=0.6, tokens=title_tokens):
+    """Drop articles whose tokens near-duplicate an earlier article's, keeping order"""
+    index = NearDuplicateIndex(threshold=threshold)
+    return [article for article in articles if index.add(tokens(article))]
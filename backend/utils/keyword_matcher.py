@@ -0,0 +1,111 @@
+import re
+
+_TOKEN = re.compile(r'\w+')
+
+
+def _word_forms(tokens):
+    """tokens plus the singular each could be a plural of ('floods' -> 'flood', 'communities' -> 'community')"""
+    forms = set(tokens)
+    for token in tokens:
+        if token.endswith('s') and len(token) > 2:
+            forms.add(token[:-1])
+            if token.endswith('es'):
+                forms.add(token[:-2])
+            if token.endswith('ies'):
+                forms.add(token[:-3] + 'y')
+    return forms
+
+
+def _phrase_pattern(keyword):
+    """Word-boundary regex for a phrase, allowing its last word to be plural"""
+    forms = rf'{re.escape(keyword)}(?:s|es)?'
+    if keyword.endswith('y'):
+        forms = rf'(?:{forms}|{re.escape(keyword[:-1])}ies)'
+    return re.compile(rf'\b{forms}\b')
+
+
+class KeywordMatcher:
+    """Single-pass keyword matcher over several named keyword groups.
+
+    A text is split into words once; single-word keywords are found by set
+    intersection with the keyword vocabulary and phrases are only checked
+    (with a word-boundary regex) in texts containing their rarest word, so
+    the cost follows the length of the text rather than the number of
+    keywords. Matching is on whole words: 'war' matches "war" and "wars" but
+    not "award" or "reward". Plural forms (-s, -es, -ies) of a keyword, or of
+    a phrase's last word, count as the keyword. A scan returns the distinct
+    keywords found for every group at once.
+    """
+
+    def __init__(self, groups):
+        self.groups = {name: list(words) for name, words in groups.items()}
+
+        # keyword -> names of the groups it belongs to
+        self._keyword_groups = {}
+        for name, words in self.groups.items():
+            for word in words:
+                word = word.lower().strip()
+                if word:
+                    self._keyword_groups.setdefault(word, set()).add(name)
+
+        self._keywords = sorted(self._keyword_groups, key=len, reverse=True)
+        self._vocabulary_cache = self._vocabulary()
+
+    def _vocabulary(self):
+        """Split keywords into single words (set lookups) and phrases (verified by regex)"""
+        words = {}
+        phrases = {}
+        for column, keyword in enumerate(self._keywords):
+            tokens = _TOKEN.findall(keyword)
+            if len(tokens) == 1 and tokens[0] == keyword:
+                words[keyword] = column
+            else:
+                # Only texts containing every word of the phrase are checked with a regex,
+                # indexed by the phrase's longest word since that is the rarest in practice
+                anchor = max(tokens, key=len) if tokens else ''
+                pattern = _phrase_pattern(keyword)
+                phrases.setdefault(anchor, []).append((column, frozenset(tokens), pattern))
+
+        names = list(self.groups)
+        membership = [[names.index(name) for name in self._keyword_groups[keyword]] for keyword in self._keywords]
+        return words, phrases, names, membership
+
+    def _columns(self, text):
+        """Indexes into self._keywords of the keywords found in text"""
+        words, phrases, _, _ = self._vocabulary_cache
+        lowered = (text or '').lower()
+        tokens = _word_forms(_TOKEN.findall(lowered))
+        columns = [words[word] for word in tokens & words.keys()]
+        for anchor in tokens & phrases.keys():
+            for column, required, pattern in phrases[anchor]:
+                if required <= tokens and pattern.search(lowered):
+                    columns.append(column)
+        return columns
+
+    def find(self, text):
+        """Return {group: set of distinct keywords found in text}"""
+        found = {name: set() for name in self.groups}
+        for column in self._columns(text):
+            keyword = self._keywords[column]
+            for name in self._keyword_groups[keyword]:
+                found[name].add(keyword)
+        return found
+
+    def count(self, text):
+        """Return {group: number of distinct keywords found in text}"""
+        counts = {name: 0 for name in self.groups}
+        _, _, names, membership = self._vocabulary_cache
+        for column in self._columns(text):
+            for g in membership[column]:
+                counts[names[g]] += 1
+        return counts
+
+    def count_many(self, texts):
+        """count() for a whole batch of texts; returns {group: list of counts, one per text}"""
+        _, _, names, membership = self._vocabulary_cache
+        counts = [[0] * len(texts) for _ in names]
+        for index, text in enumerate(texts):
+            for column in self._columns(text):
+                for g in membership[column]:
+                    counts[g][index] += 1
+        return dict(zip(names, counts))
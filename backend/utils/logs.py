@@ -0,0 +1,167 @@
+import atexit
+import json
+import logging
+import queue
+import sys
+import threading
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+# Set per request; log records made while handling it carry the id
+request_id_var = ContextVar('request_id', default='-')
+
+# Attributes every LogRecord has; anything else was passed in `extra`
+_RECORD_FIELDS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'request_id'}
+
+
+class RequestIdFilter(logging.Filter):
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps 1 in N of the high-volume records.
+
+    Only records logged with extra={'sampled': True} are sampled, and only at
+    INFO or below. Each message template is counted separately and its first
+    occurrence is always kept. `rates` maps logger name prefixes to the
+    fraction to keep, overriding `default_rate`.
+    """
+
+    def __init__(self, default_rate=1.0, rates=None):
+        super().__init__()
+        self.default_rate = default_rate
+        self.rates = sorted((rates or {}).items(), key=lambda item: len(item[0]), reverse=True)
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def _rate(self, name):
+        for prefix, rate in self.rates:
+            if name == prefix or name.startswith(prefix + '.'):
+                return rate
+        return self.default_rate
+
+    def filter(self, record):
+        if not getattr(record, 'sampled', False) or record.levelno > logging.INFO:
+            return True
+        rate = self._rate(record.name)
+        if rate >= 1:
+            return True
+        if rate <= 0:
+            return False
+        every = round(1 / rate)
+        key = (record.name, record.msg)
+        with self._lock:
+            seen = self._counts.get(key, 0)
+            self._counts[key] = seen + 1
+        return seen % every == 0
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, request id, message and any extra fields"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'request_id': getattr(record, 'request_id', '-'),
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS and key != 'sampled':
+                entry[key] = value
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that drops records instead of blocking or erroring when the queue is full"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_listener = None
+_handler = None
+
+
+def parse_levels(spec):
+    """'mindly.upstream=WARNING,werkzeug=ERROR' -> {'mindly.upstream': 'WARNING', 'werkzeug': 'ERROR'}"""
+    levels = {}
+    for item in (spec or '').split(','):
+        name, _, level = item.partition('=')
+        if name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def parse_rates(spec):
+    """'mindly.feeds=0.1,mindly.http=0.01' -> {'mindly.feeds': 0.1, 'mindly.http': 0.01}"""
+    return {name: float(rate) for name, rate in parse_levels(spec).items()}
+
+
+def configure_logging(level='INFO', levels=None, fmt='text', sample_rate=1.0, sample_rates=None,
+                      queue_size=10000, stream=None):
+    """Route all logging through a bounded queue drained by one background thread.
+
+    Callers only format and enqueue a record, so a slow or piped stdout never
+    blocks request threads; if the queue fills up records are dropped and
+    counted. `levels` sets per-logger levels. Safe to call more than once;
+    later calls only adjust levels.
+    """
+    global _listener, _handler
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    for name, logger_level in (levels or {}).items():
+        logging.getLogger(name).setLevel(logger_level)
+    if _listener is not None:
+        return _handler
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    if fmt == 'json':
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter('%(asctime)s %(levelname)-7s %(name)s [%(request_id)s] %(message)s'))
+
+    log_queue = queue.Queue(maxsize=queue_size)
+    _handler = DroppingQueueHandler(log_queue)
+    _handler.addFilter(RequestIdFilter())
+    _handler.addFilter(SamplingFilter(sample_rate, sample_rates))
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(_handler)
+
+    _listener = QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+    return _handler
+
+
+def restart_logging_after_fork():
+    """Give a forked worker its own queue and listener; the parent's thread does not survive fork"""
+    global _listener
+    if _listener is None:
+        return
+    _handler.queue = queue.Queue(maxsize=_handler.queue.maxsize)
+    _listener = QueueListener(_handler.queue, *_listener.handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def stop_logging():
+    """Flush queued records and stop the background thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,378 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+
+def _refilled(tokens, updated, capacity, period, now):
+    return min(capacity, tokens + max(0.0, now - updated) * capacity / period)
+
+
+class CacheBackend:
+    """Interface for the news cache.
+
+    Entries are stored with the time they were written and a TTL after which
+    the backend drops them. Callers decide freshness themselves from the
+    stored time, so an entry can outlive its freshness window and still be
+    served stale while it is rebuilt.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._stats_lock = threading.Lock()
+
+    def get(self, key):
+        """Return (value, stored_at) or None if the key is missing or expired"""
+        raise NotImplementedError
+
+    def set(self, key, value, ttl):
+        """Store a JSON-serializable value for ttl seconds"""
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def acquire_lease(self, name, ttl):
+        """Try to take a short-lived exclusive lease; False if someone else holds it"""
+        raise NotImplementedError
+
+    def release_lease(self, name):
+        raise NotImplementedError
+
+    def token_levels(self, buckets):
+        """Tokens left in each of `buckets` ({name: (capacity, period)}); buckets never used are full"""
+        raise NotImplementedError
+
+    def take_tokens(self, buckets, n=1):
+        """Take n tokens from every bucket or from none; returns whether they were taken.
+
+        Buckets refill continuously at capacity per period, so processes
+        sharing the backend share one budget and it survives restarts as long
+        as the backend does.
+        """
+        raise NotImplementedError
+
+    def return_tokens(self, buckets, n=1):
+        """Put back n tokens taken with take_tokens(), up to each bucket's capacity"""
+        raise NotImplementedError
+
+    def drain_tokens(self, buckets):
+        """Empty the buckets; they start refilling from now"""
+        raise NotImplementedError
+
+    def close(self):
+        """Drop connections held by the calling thread; they reopen on next use"""
+
+    def stats(self):
+        with self._stats_lock:
+            lookups = self.hits + self.misses
+            return {
+                'backend': type(self).__name__,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': self.hits / lookups if lookups else 0.0
+            }
+
+    def _record(self, hit):
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def _record_evictions(self, count):
+        if count:
+            with self._stats_lock:
+                self.evictions += count
+
+
+class MemoryCache(CacheBackend):
+    """In-process LRU cache bounded by number of entries"""
+
+    def __init__(self, max_entries=128):
+        super().__init__()
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._leases = {}
+        self._tokens = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] <= now:
+                del self._entries[key]
+                self._record_evictions(1)
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+        self._record(entry is not None)
+        if entry is None:
+            return None
+        value, stored_at, _ = entry
+        return value, datetime.fromtimestamp(stored_at, timezone.utc)
+
+    def set(self, key, value, ttl):
+        now = time.time()
+        with self._lock:
+            self._entries[key] = (value, now, now + ttl)
+            self._entries.move_to_end(key)
+            evicted = 0
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+        self._record_evictions(evicted)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def acquire_lease(self, name, ttl):
+        now = time.time()
+        with self._lock:
+            if self._leases.get(name, 0) > now:
+                return False
+            self._leases[name] = now + ttl
+            return True
+
+    def release_lease(self, name):
+        with self._lock:
+            self._leases.pop(name, None)
+
+    def _levels(self, buckets, now):
+        levels = {}
+        for name, (capacity, period) in buckets.items():
+            tokens, updated = self._tokens.get(name, (capacity, now))
+            levels[name] = _refilled(tokens, updated, capacity, period, now)
+        return levels
+
+    def token_levels(self, buckets):
+        with self._lock:
+            return self._levels(buckets, time.time())
+
+    def take_tokens(self, buckets, n=1):
+        now = time.time()
+        with self._lock:
+            levels = self._levels(buckets, now)
+            if any(tokens < n for tokens in levels.values()):
+                return False
+            for name, tokens in levels.items():
+                self._tokens[name] = (tokens - n, now)
+            return True
+
+    def return_tokens(self, buckets, n=1):
+        now = time.time()
+        with self._lock:
+            for name, tokens in self._levels(buckets, now).items():
+                self._tokens[name] = (min(buckets[name][0], tokens + n), now)
+
+    def drain_tokens(self, buckets):
+        now = time.time()
+        with self._lock:
+            for name in buckets:
+                self._tokens[name] = (0.0, now)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+class SQLiteCache(CacheBackend):
+    """Cache shared by every process that opens the same SQLite file.
+
+    Values are stored as JSON. Eviction drops expired rows first, then the
+    least recently read rows once the table grows past max_entries. Read
+    times are only written back once they are `touch_interval` seconds out of
+    date, so cache hits don't take the write lock on every request.
+    """
+
+    touch_interval = 60
+
+    def __init__(self, path, max_entries=128):
+        super().__init__()
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+
+        conn = self._connect()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS cache_entries ('
+            ' key TEXT PRIMARY KEY,'
+            ' value TEXT NOT NULL,'
+            ' stored_at REAL NOT NULL,'
+            ' expires_at REAL NOT NULL,'
+            ' accessed_at REAL NOT NULL)'
+        )
+        conn.execute('CREATE INDEX IF NOT EXISTS ix_cache_entries_accessed_at ON cache_entries (accessed_at)')
+        conn.execute('CREATE TABLE IF NOT EXISTS cache_leases (name TEXT PRIMARY KEY, expires_at REAL NOT NULL)')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS token_buckets ('
+            ' name TEXT PRIMARY KEY,'
+            ' tokens REAL NOT NULL,'
+            ' updated_at REAL NOT NULL)'
+        )
+        conn.commit()
+
+    def _connect(self):
+        # sqlite3 connections must not be shared between threads
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        now = time.time()
+        conn = self._connect()
+        row = conn.execute(
+            'SELECT value, stored_at, accessed_at FROM cache_entries WHERE key = ? AND expires_at > ?',
+            (key, now)
+        ).fetchone()
+
+        self._record(row is not None)
+        if row is None:
+            return None
+
+        value, stored_at, accessed_at = row
+        if now - accessed_at > self.touch_interval:
+            conn.execute('UPDATE cache_entries SET accessed_at = ? WHERE key = ?', (now, key))
+        return json.loads(value), datetime.fromtimestamp(stored_at, timezone.utc)
+
+    def set(self, key, value, ttl):
+        now = time.time()
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute(
+                'INSERT OR REPLACE INTO cache_entries (key, value, stored_at, expires_at, accessed_at)'
+                ' VALUES (?, ?, ?, ?, ?)',
+                (key, json.dumps(value), now, now + ttl, now)
+            )
+            evicted = conn.execute('DELETE FROM cache_entries WHERE expires_at <= ?', (now,)).rowcount
+            evicted += conn.execute(
+                'DELETE FROM cache_entries WHERE key IN ('
+                ' SELECT key FROM cache_entries ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)',
+                (self.max_entries,)
+            ).rowcount
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        self._record_evictions(evicted)
+
+    def delete(self, key):
+        self._connect().execute('DELETE FROM cache_entries WHERE key = ?', (key,))
+
+    def clear(self):
+        self._connect().execute('DELETE FROM cache_entries')
+
+    def acquire_lease(self, name, ttl):
+        now = time.time()
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute('DELETE FROM cache_leases WHERE name = ? AND expires_at <= ?', (name, now))
+            acquired = conn.execute(
+                'INSERT OR IGNORE INTO cache_leases (name, expires_at) VALUES (?, ?)',
+                (name, now + ttl)
+            ).rowcount == 1
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return acquired
+
+    def release_lease(self, name):
+        self._connect().execute('DELETE FROM cache_leases WHERE name = ?', (name,))
+
+    def _levels(self, conn, buckets, now):
+        names = list(buckets)
+        rows = conn.execute(
+            f'SELECT name, tokens, updated_at FROM token_buckets WHERE name IN ({",".join("?" * len(names))})',
+            names
+        ).fetchall()
+        stored = {name: (tokens, updated_at) for name, tokens, updated_at in rows}
+        levels = {}
+        for name, (capacity, period) in buckets.items():
+            tokens, updated_at = stored.get(name, (capacity, now))
+            levels[name] = _refilled(tokens, updated_at, capacity, period, now)
+        return levels
+
+    def token_levels(self, buckets):
+        # Read-only so checking the budget on every request doesn't take the write lock
+        return self._levels(self._connect(), buckets, time.time())
+
+    def take_tokens(self, buckets, n=1):
+        now = time.time()
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            levels = self._levels(conn, buckets, now)
+            taken = all(tokens >= n for tokens in levels.values())
+            if taken:
+                conn.executemany(
+                    'INSERT OR REPLACE INTO token_buckets (name, tokens, updated_at) VALUES (?, ?, ?)',
+                    [(name, tokens - n, now) for name, tokens in levels.items()]
+                )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return taken
+
+    def return_tokens(self, buckets, n=1):
+        now = time.time()
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            levels = self._levels(conn, buckets, now)
+            conn.executemany(
+                'INSERT OR REPLACE INTO token_buckets (name, tokens, updated_at) VALUES (?, ?, ?)',
+                [(name, min(buckets[name][0], tokens + n), now) for name, tokens in levels.items()]
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def drain_tokens(self, buckets):
+        now = time.time()
+        self._connect().executemany(
+            'INSERT OR REPLACE INTO token_buckets (name, tokens, updated_at) VALUES (?, 0, ?)',
+            [(name, now) for name in buckets]
+        )
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def __len__(self):
+        return self._connect().execute('SELECT COUNT(*) FROM cache_entries').fetchone()[0]
+
+
+def create_cache(backend, path=None, max_entries=128):
+    """Build a cache backend by name ('memory' or 'sqlite')"""
+    if backend == 'memory':
+        return MemoryCache(max_entries=max_entries)
+    if backend == 'sqlite':
+        if not path:
+            raise ValueError('sqlite cache backend needs a path')
+        return SQLiteCache(path, max_entries=max_entries)
+    raise ValueError(f'Unknown cache backend: {backend}')
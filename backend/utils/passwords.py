@@ -0,0 +1,114 @@
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+class HasherBusy(Exception):
+    """Raised when too many hash operations are already queued, or one did not finish in time"""
+
+
+class PasswordHasher:
+    """Runs password hashing and verification on a small process pool.
+
+    KDF calls are CPU-bound and hold the GIL, so running them on request
+    threads stalls every other endpoint. Work is handed to `workers` processes
+    and at most `max_pending` operations may be queued or running at once;
+    beyond that callers get HasherBusy immediately instead of piling up. An
+    operation still counts against `max_pending` until it finishes, even if
+    its caller gave up waiting after `timeout` seconds. With workers=0
+    everything runs inline, which is handy for debugging.
+    """
+
+    def __init__(self, method, workers=2, max_pending=32, timeout=10):
+        self.method = method
+        self.workers = workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        # Made here, on the calling thread, so verify() and needs_rehash() never
+        # have to queue an extra hash for it
+        self._dummy_hash = generate_password_hash('not-a-real-password', method)
+        self._method_prefix = self._dummy_hash.split('$', 1)[0]
+
+    def _get_pool(self):
+        # Created on first use so importing the app never forks
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            return self._pool
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HasherBusy()
+        if self.workers <= 0:
+            try:
+                return fn(*args)
+            finally:
+                self._slots.release()
+
+        try:
+            future = self._get_pool().submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda future: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            future.cancel()
+            raise HasherBusy() from None
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, pwhash, password):
+        """Check a password; pass pwhash=None for unknown users.
+
+        Unknown users are verified against a dummy hash made with the current
+        parameters, so a miss costs the same as a wrong password and response
+        times don't reveal which accounts exist.
+        """
+        if pwhash is None:
+            self._run(check_password_hash, self._dummy_hash, password)
+            return False
+        return self._run(check_password_hash, pwhash, password)
+
+    def needs_rehash(self, pwhash):
+        """True if pwhash was made with different parameters than the current method.
+
+        Shorthands like 'pbkdf2' or 'scrypt' are stored expanded
+        ('pbkdf2:sha256:600000'), so the comparison is against the prefix of a
+        hash actually made with the method, not the method string itself.
+        """
+        return pwhash.split('$', 1)[0] != self._method_prefix
+
+    def shutdown(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+def benchmark(methods, rounds=5):
+    """Average seconds per hash for each method, to pick PASSWORD_HASH_METHOD"""
+    results = {}
+    for method in methods:
+        started = time.perf_counter()
+        for _ in range(rounds):
+            generate_password_hash('benchmark-password', method)
+        results[method] = (time.perf_counter() - started) / rounds
+    return results
+
+
+if __name__ == '__main__':
+    candidates = [
+        'pbkdf2:sha256:260000',
+        'pbkdf2:sha256:600000',
+        'scrypt:32768:8:1',
+        'scrypt:65536:8:1',
+    ]
+    for method, seconds in benchmark(candidates).items():
+        print(f"{method:<24} {seconds * 1000:8.1f} ms/hash")
@@ -0,0 +1,185 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """`capacity` requests per `period` seconds, refilled continuously"""
+
+    def __init__(self, capacity, period, clock=time.monotonic):
+        self.capacity = capacity
+        self.period = period
+        self._clock = clock
+        self._tokens = float(capacity)
+        self._updated = clock()
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.capacity / self.period)
+        self._updated = now
+
+    @property
+    def tokens(self):
+        self._refill()
+        return self._tokens
+
+    def take(self, n=1):
+        self._refill()
+        if self._tokens < n:
+            return False
+        self._tokens -= n
+        return True
+
+    def drain(self):
+        self._refill()
+        self._tokens = 0.0
+
+    def put(self, n=1):
+        self._refill()
+        self._tokens = min(self.capacity, self._tokens + n)
+
+    def scale(self, factor):
+        """Resize the bucket, keeping the same share of it full"""
+        self._refill()
+        self.capacity *= factor
+        self._tokens *= factor
+
+
+class QuotaBudget:
+    """Remaining upstream quota for one provider across one or more windows.
+
+    `limits` maps a window name to (requests, seconds), e.g.
+    {'day': (100, 86400), 'hour': (10, 3600)}. A request is only allowed when
+    every window has a token left. Windows with a limit of 0 are ignored.
+
+    With a `store` (a news cache backend) the buckets are kept there under
+    `name`, so every process using the same store spends from one budget and
+    a restart doesn't refill it. Without one they live in this process.
+    """
+
+    def __init__(self, limits, clock=time.monotonic, store=None, name='quota'):
+        self._limits = {window: (capacity, period) for window, (capacity, period) in limits.items() if capacity > 0}
+        self._store = store
+        self._keys = {f'quota:{name}:{window}': window for window in self._limits}
+        self._buckets = {} if store is not None else {
+            window: TokenBucket(capacity, period, clock)
+            for window, (capacity, period) in self._limits.items()
+        }
+        self._lock = threading.Lock()
+        self.spent = 0
+        self.denied = 0
+
+    def _store_buckets(self):
+        return {key: self._limits[window] for key, window in self._keys.items()}
+
+    def _levels(self):
+        if self._store is None:
+            return {window: bucket.tokens for window, bucket in self._buckets.items()}
+        if not self._keys:
+            return {}
+        levels = self._store.token_levels(self._store_buckets())
+        return {self._keys[key]: tokens for key, tokens in levels.items()}
+
+    def try_spend(self, n=1):
+        """Reserve n requests; returns False (reserving nothing) if any window is short"""
+        with self._lock:
+            if self._store is not None:
+                allowed = not self._keys or self._store.take_tokens(self._store_buckets(), n)
+            else:
+                allowed = all(bucket.tokens >= n for bucket in self._buckets.values())
+                if allowed:
+                    for bucket in self._buckets.values():
+                        bucket.take(n)
+            if allowed:
+                self.spent += n
+            else:
+                self.denied += 1
+            return allowed
+
+    def refund(self, n=1):
+        """Give back n requests reserved with try_spend() that were never sent"""
+        with self._lock:
+            if self._store is not None:
+                if self._keys:
+                    self._store.return_tokens(self._store_buckets(), n)
+            else:
+                for bucket in self._buckets.values():
+                    bucket.put(n)
+            self.spent -= n
+
+    def exhaust(self):
+        """The provider reported its quota is used up; stop spending until the buckets refill"""
+        with self._lock:
+            if self._store is not None:
+                if self._keys:
+                    self._store.drain_tokens(self._store_buckets())
+                return
+            for bucket in self._buckets.values():
+                bucket.drain()
+
+    def share(self, processes):
+        """Keep 1/processes of a process-local budget, for workers that can't share a store"""
+        if self._store is not None or processes <= 1:
+            return
+        with self._lock:
+            for window, (capacity, period) in self._limits.items():
+                self._limits[window] = (capacity / processes, period)
+                self._buckets[window].scale(1 / processes)
+
+    def fraction_remaining(self):
+        """Share of the tightest window still available, 1.0 when unlimited"""
+        with self._lock:
+            levels = self._levels()
+        return min((tokens / self._limits[window][0] for window, tokens in levels.items()), default=1.0)
+
+    def stretch_factor(self, low_water=0.5, max_stretch=8.0):
+        """How much longer to wait between refreshes given the remaining quota.
+
+        1.0 while more than `low_water` of the budget is left, growing as the
+        budget drains, capped at `max_stretch`.
+        """
+        fraction = self.fraction_remaining()
+        if fraction >= low_water:
+            return 1.0
+        return min(max_stretch, low_water / max(fraction, low_water / max_stretch))
+
+    def snapshot(self):
+        with self._lock:
+            levels = self._levels()
+            windows = {
+                window: {'remaining': round(tokens, 2), 'capacity': self._limits[window][0],
+                         'period': self._limits[window][1]}
+                for window, tokens in levels.items()
+            }
+            return {'windows': windows, 'spent': self.spent, 'denied': self.denied}
+
+
+class QueryYields:
+    """Moving average of how many useful articles each upstream query returns.
+
+    Queries that have never run rank first so they get measured at least once.
+    """
+
+    def __init__(self, alpha=0.3):
+        self.alpha = alpha
+        self._yields = {}
+        self._runs = {}
+        self._lock = threading.Lock()
+
+    def record(self, key, kept):
+        with self._lock:
+            previous = self._yields.get(key)
+            self._yields[key] = kept if previous is None else previous + self.alpha * (kept - previous)
+            self._runs[key] = self._runs.get(key, 0) + 1
+
+    def get(self, key):
+        with self._lock:
+            return self._yields.get(key)
+
+    def rank(self, keys):
+        """keys ordered from most to least productive (unmeasured first), stable on ties"""
+        with self._lock:
+            return sorted(keys, key=lambda key: -self._yields.get(key, float('inf')))
+
+    def snapshot(self):
+        with self._lock:
+            return {key: {'yield': round(value, 2), 'runs': self._runs[key]} for key, value in self._yields.items()}
@@ -0,0 +1,37 @@
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+
+
+class SessionTokens:
+    """Signed, stateless session tokens carrying a user's id and username.
+
+    Verifying a token only checks its signature and age, so routes can tell
+    who is calling without touching the database.
+    """
+
+    def __init__(self, secret_key, max_age, salt='mindly-session'):
+        self.max_age = max_age
+        self._serializer = URLSafeTimedSerializer(secret_key, salt=salt)
+
+    def issue(self, user_id, username):
+        return self._serializer.dumps({'uid': user_id, 'username': username})
+
+    def verify(self, token):
+        """Return the token payload, or None if it is forged, malformed or expired"""
+        try:
+            payload = self._serializer.loads(token, max_age=self.max_age)
+        except BadSignature:
+            # SignatureExpired is a subclass of BadSignature
+            return None
+        if not isinstance(payload, dict) or 'uid' not in payload or 'username' not in payload:
+            return None
+        return payload
+
+
+def bearer_token(authorization_header):
+    """Extract the token from an 'Authorization: Bearer <token>' header"""
+    if not authorization_header:
+        return None
+    scheme, _, token = authorization_header.partition(' ')
+    if scheme.lower() != 'bearer' or not token.strip():
+        return None
+    return token.strip()
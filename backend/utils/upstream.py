@@ -0,0 +1,249 @@
+import random
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class UpstreamError(Exception):
+    """An upstream call failed after any retries; `status` is the last HTTP status, if any"""
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+class CircuitOpen(UpstreamError):
+    """The provider has been failing and is being skipped until its breaker resets"""
+
+
+class CircuitBreaker:
+    """Per-provider failure switch.
+
+    After `failure_threshold` consecutive failed calls the breaker opens and
+    calls are refused without touching the network. Once `reset_timeout`
+    seconds pass a single probe call is let through (half-open): success
+    closes the breaker, failure opens it for another `reset_timeout`.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=60, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self._opened_at is None:
+            return self.CLOSED
+        if self._clock() - self._opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self):
+        """True if a call may go ahead now"""
+        with self._lock:
+            state = self._state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+            self._probing = False
+
+
+class UpstreamClient:
+    """Shared HTTP client for the news providers.
+
+    One keep-alive session is reused for every call, so concurrent queries
+    share pooled connections instead of paying a TCP+TLS handshake each.
+    Timeouts, connection errors, 429 and 5xx responses are retried up to
+    `retries` times with full-jitter exponential backoff (honouring
+    Retry-After). Given a time budget, each attempt's connect and read
+    timeouts are cut to the time left and no attempt or backoff starts once
+    it has run out. Each provider has its own CircuitBreaker. Responses
+    carrying an ETag or Last-Modified are kept so repeat requests can be made
+    conditional and answered by a 304.
+    `observer`, if given, is called as observer(provider, params, status,
+    seconds) after every attempt; status is the HTTP status, 'error' for a
+    failed connection or 'circuit_open' for a skipped call.
+    """
+
+    RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+    def __init__(self, headers=None, timeout=(3.05, 10), retries=2, backoff=0.5, max_backoff=8,
+                 pool_size=10, failure_threshold=5, reset_timeout=60, max_validators=256,
+                 sleep=time.sleep, observer=None):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_validators = max_validators
+        self._sleep = sleep
+        self._observer = observer
+
+        self.session = requests.Session()
+        self.session.headers.update(headers or {})
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self._breakers = {}
+        self._validators = OrderedDict()
+        self._lock = threading.Lock()
+
+    def breaker(self, provider):
+        with self._lock:
+            breaker = self._breakers.get(provider)
+            if breaker is None:
+                breaker = self._breakers[provider] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            return breaker
+
+    def breaker_states(self):
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {provider: breaker.state for provider, breaker in breakers.items()}
+
+    def _retry_delay(self, attempt, response):
+        delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, float(retry_after))
+        return delay
+
+    def _conditional_headers(self, cache_key):
+        with self._lock:
+            cached = self._validators.get(cache_key)
+            if cached is None:
+                return {}, None
+            self._validators.move_to_end(cache_key)
+        etag, last_modified, body = cached
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+        return headers, body
+
+    def _remember(self, cache_key, response, body):
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return
+        with self._lock:
+            self._validators[cache_key] = (etag, last_modified, body)
+            self._validators.move_to_end(cache_key)
+            while len(self._validators) > self.max_validators:
+                self._validators.popitem(last=False)
+
+    def _observe(self, provider, params, status, seconds):
+        if self._observer is not None:
+            self._observer(provider, params, status, seconds)
+
+    def get_json(self, provider, url, params=None, budget=None, quota=None, retry_statuses=None):
+        """GET a JSON document from a provider.
+
+        `budget` caps the seconds spent on this call including retries; a
+        server trickling bytes can still overrun it by up to one read
+        timeout, since requests applies that per socket read. Raises
+        CircuitOpen if the provider is being skipped and UpstreamError if
+        every attempt failed or the provider rejected the request.
+
+        `quota`, if given, is charged with try_spend() for every retry (the
+        caller pays for the first attempt) and retrying stops once it refuses.
+        `retry_statuses` overrides which HTTP statuses are retried.
+        """
+        params = params or {}
+        if budget is not None and budget <= 0:
+            raise UpstreamError(f'{provider} call has no time left')
+        breaker = self.breaker(provider)
+        if not breaker.allow():
+            self._observe(provider, params, 'circuit_open', 0.0)
+            raise CircuitOpen(f'{provider} circuit is open')
+
+        cache_key = (url, tuple(sorted(params.items())))
+        conditional, cached_body = self._conditional_headers(cache_key)
+        give_up_at = time.monotonic() + budget if budget is not None else None
+
+        retry_statuses = self.RETRY_STATUSES if retry_statuses is None else retry_statuses
+        error = None
+        for attempt in range(self.retries + 1):
+            response = None
+            timeout = self.timeout
+            if give_up_at is not None:
+                left = give_up_at - time.monotonic()
+                if left <= 0:
+                    break
+                parts = self.timeout if isinstance(self.timeout, tuple) else (self.timeout, self.timeout)
+                timeout = tuple(min(part, left) for part in parts)
+            started = time.perf_counter()
+            try:
+                response = self.session.get(url, params=params, headers=conditional, timeout=timeout)
+            except requests.RequestException as e:
+                self._observe(provider, params, 'error', time.perf_counter() - started)
+                error = UpstreamError(f'{provider} request failed: {e}')
+            else:
+                self._observe(provider, params, response.status_code, time.perf_counter() - started)
+                if response.status_code == 304 and cached_body is not None:
+                    breaker.record_success()
+                    return cached_body
+                if response.status_code == 200:
+                    try:
+                        body = response.json()
+                    except ValueError:
+                        error = UpstreamError(f'{provider} returned invalid JSON', response.status_code)
+                    else:
+                        breaker.record_success()
+                        self._remember(cache_key, response, body)
+                        return body
+                elif response.status_code in retry_statuses:
+                    error = UpstreamError(f'{provider} returned {response.status_code}', response.status_code)
+                else:
+                    # The provider is up but refused this request (bad key, bad query); retrying won't help
+                    breaker.record_success()
+                    raise UpstreamError(f'{provider} returned {response.status_code}', response.status_code)
+
+            if attempt == self.retries:
+                break
+            delay = self._retry_delay(attempt, response)
+            if give_up_at is not None and time.monotonic() + delay >= give_up_at:
+                break
+            if quota is not None and not quota.try_spend():
+                break
+            self._sleep(delay)
+
+        if error is None:
+            error = UpstreamError(f'{provider} call ran out of time')
+        breaker.record_failure()
+        raise error
+
+    def close(self):
+        self.session.close()
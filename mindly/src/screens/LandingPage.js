@@ -28,6 +28,9 @@ const { width: screenWidth, height: screenHeight } = Dimensions.get('window');
 const SwipeableNewsScreen = ({ onLogout, user, navigateToSaved }) => {
   console.log('User object in SwipeableNewsScreen:', user);
   console.log('User ID:', user?.id);
+
+  // Session token from login/signup lets the backend skip the username lookup
+  const authHeaders = user?.token ? { Authorization: `Bearer ${user.token}` } : {};
   console.log('User keys:', user ? Object.keys(user) : 'User is null/undefined');
   const [articles, setArticles] = useState([]);
   const [loading, setLoading] = useState(true);
@@ -81,23 +84,18 @@ const SwipeableNewsScreen = ({ onLogout, user, navigateToSaved }) => {
     }
 
     try {
-      const savedSet = new Set();
+      // Check every article's saved status in one request
+      const response = await fetch(`http://192.168.1.115:5000/api/users/${user.username}/saved-articles/check-batch`, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+          ...authHeaders,
+        },
+        body: JSON.stringify({ urls: articles.map(article => article.url) })
+      });
       
-      // Check each article's saved status
-      for (const article of articles) {
-        const response = await fetch(`http://192.168.1.115:5000/api/users/${user.username}/saved-articles/check`, {
-          method: 'POST',
-          headers: {
-            'Content-Type': 'application/json',
-          },
-          body: JSON.stringify({ url: article.url })
-        });
-        
-        const data = await response.json();
-        if (data.is_saved) {
-          savedSet.add(article.url);
-        }
-      }
+      const data = await response.json();
+      const savedSet = new Set(Object.keys(data.saved || {}));
       
       setSavedArticles(savedSet);
     } catch (error) {
@@ -125,6 +123,7 @@ const SwipeableNewsScreen = ({ onLogout, user, navigateToSaved }) => {
           method: 'POST',
           headers: {
             'Content-Type': 'application/json',
+            ...authHeaders,
           },
           body: JSON.stringify({ url: currentArticle.url })
         });
@@ -134,6 +133,7 @@ const SwipeableNewsScreen = ({ onLogout, user, navigateToSaved }) => {
         if (checkData.is_saved && checkData.saved_article_id) {
           const response = await fetch(`http://192.168.1.115:5000/api/users/${user.username}/saved-articles/${checkData.saved_article_id}`, {
             method: 'DELETE',
+            headers: authHeaders,
           });
           
           if (response.ok) {
@@ -152,6 +152,7 @@ const SwipeableNewsScreen = ({ onLogout, user, navigateToSaved }) => {
           method: 'POST',
           headers: {
             'Content-Type': 'application/json',
+            ...authHeaders,
           },
           body: JSON.stringify({
             title: currentArticle.title,
@@ -157,7 +157,7 @@ const MultiStepSignup = ({ onSignupSuccess, onSwitchToLogin }) => {
       console.log('📡 Signup response:', data);
 
       if (data.user || data.message === 'User created successfully') {
-        const user = data.user || {
+        const user = data.user ? { ...data.user, token: data.token } : {
           username: completeSignupData.username,
           email: completeSignupData.email,
         };
@@ -19,9 +19,13 @@ const { width: screenWidth } = Dimensions.get('window');
 
 const SavedArticlesScreen = ({ user, onGoBack }) => {
   const [savedArticles, setSavedArticles] = useState([]);
+  const authHeaders = user?.token ? { Authorization: `Bearer ${user.token}` } : {};
   const [loading, setLoading] = useState(true);
   const [refreshing, setRefreshing] = useState(false);
   const [error, setError] = useState(null);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [totalCount, setTotalCount] = useState(0);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     fetchSavedArticles();
@@ -42,11 +46,13 @@ const SavedArticlesScreen = ({ user, onGoBack }) => {
       }
       setError(null);
 
-      const response = await fetch(`http://192.168.1.115:5000/api/users/${user.username}/saved-articles`);
+      const response = await fetch(`http://192.168.1.115:5000/api/users/${user.username}/saved-articles`, { headers: authHeaders });
       const data = await response.json();
 
       if (response.ok && data.status === 'success') {
         setSavedArticles(data.saved_articles || []);
+        setNextCursor(data.next_cursor || null);
+        setTotalCount(data.count || 0);
       } else {
         setError(data.error || 'Failed to fetch saved articles');
       }
@@ -63,6 +69,26 @@ const SavedArticlesScreen = ({ user, onGoBack }) => {
     fetchSavedArticles(true);
   };
 
+  const fetchMoreSavedArticles = async () => {
+    if (!user || !nextCursor || loadingMore) return;
+
+    try {
+      setLoadingMore(true);
+      const response = await fetch(`http://192.168.1.115:5000/api/users/${user.username}/saved-articles?cursor=${encodeURIComponent(nextCursor)}`, { headers: authHeaders });
+      const data = await response.json();
+
+      if (response.ok && data.status === 'success') {
+        setSavedArticles(prev => [...prev, ...(data.saved_articles || [])]);
+        setNextCursor(data.next_cursor || null);
+        setTotalCount(data.count || 0);
+      }
+    } catch (err) {
+      console.error('Error fetching more saved articles:', err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const openArticle = async (url) => {
     if (url) {
       try {
@@ -89,10 +115,12 @@ const SavedArticlesScreen = ({ user, onGoBack }) => {
             try {
               const response = await fetch(`http://192.168.1.115:5000/api/users/${user.username}/saved-articles/${article.id}`, {
                 method: 'DELETE',
+                headers: authHeaders,
               });
 
               if (response.ok) {
                 setSavedArticles(prev => prev.filter(item => item.id !== article.id));
+                setTotalCount(prev => Math.max(prev - 1, 0));
               } else {
                 const errorData = await response.json();
                 Alert.alert('Error', errorData.error || 'Failed to remove article');
@@ -282,7 +310,7 @@ const SavedArticlesScreen = ({ user, onGoBack }) => {
         <Text style={styles.screenTitle}>Saved Articles</Text>
         {savedArticles.length > 0 && (
           <Text style={styles.articleCount}>
-            {savedArticles.length} article{savedArticles.length !== 1 ? 's' : ''} saved
+            {totalCount} article{totalCount !== 1 ? 's' : ''} saved
           </Text>
         )}
       </View>
@@ -306,6 +334,8 @@ const SavedArticlesScreen = ({ user, onGoBack }) => {
           />
         }
         ListEmptyComponent={renderEmptyState}
+        onEndReached={fetchMoreSavedArticles}
+        onEndReachedThreshold={0.5}
       />
     </View>
   );